@@ -0,0 +1,165 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.Orderbook import *
+from multiprocessing import Pipe, Process
+from zlib import crc32
+
+
+def shardOf(instrument, numShards):
+	"""
+	Shard of an instrument, a (cash token, security token) pair. Stable
+	across processes and runs, unlike hash() of a string.
+	"""
+	cash_token, security_token = instrument
+	return crc32(f"{cash_token}/{security_token}".encode()) % numShards
+
+
+class Shard(object):
+	"""
+	Shard
+	-----
+
+	The books of every instrument routed to one worker. It is their only
+	writer.
+	"""
+	def __init__(self, backend='sortedlist'):
+		self.backend = backend
+		self.books = {}
+
+	def book(self, instrument):
+		book = self.books.get(instrument)
+		if book is None:
+			book = self.books[instrument] = Orderbook(self.backend, retainTrades=0)
+		return book
+
+	def process(self, batches):
+		"""
+		Processes [(instrument, orders)] and returns [(instrument, trades)]
+		with the trades each instrument's book emitted
+		"""
+		results = []
+		for instrument, orders in batches:
+			book = self.book(instrument)
+			book.process_batch(orders, reports=False)
+			results.append((instrument, book.trades.drain()))
+		return results
+
+	def top(self, instrument):
+		book = self.books.get(instrument)
+		if book is None:
+			return None, None
+		return book.getBid(), book.getAsk()
+
+
+def _serve(conn, backend):
+	"""
+	Worker process loop: owns one Shard and answers requests on conn
+	"""
+	shard = Shard(backend)
+	while True:
+		message = conn.recv()
+		if message[0] == 'process':
+			conn.send(shard.process(message[1]))
+		elif message[0] == 'top':
+			conn.send(shard.top(message[1]))
+		elif message[0] == 'close':
+			conn.close()
+			return
+
+
+class EngineManager(object):
+	"""
+	Engine manager
+	--------------
+
+	Routes orders to one book per instrument, a (cash token, security token)
+	pair. The books are spread over a pool of worker processes by shardOf,
+	so each book has a single writer. With workers=0 the shards run in this
+	process instead.
+
+	Orders are buffered by submit() and sent to the workers by flush(), which
+	returns the merged trade stream as (instrument, trade) pairs. Each
+	trade's seq is its sequence number within its instrument.
+	"""
+	def __init__(self, workers=2, backend='sortedlist'):
+		self.numShards = max(workers, 1)
+		self.pending = [{} for _ in range(self.numShards)]
+		self.conns = []
+		self.processes = []
+		self.shards = []
+		if workers == 0:
+			self.shards = [Shard(backend)]
+			return
+		for _ in range(workers):
+			parent, child = Pipe()
+			process = Process(target=_serve, args=(child, backend), daemon=True)
+			process.start()
+			child.close()
+			self.conns.append(parent)
+			self.processes.append(process)
+
+	def submit(self, instrument, order):
+		"""
+		Buffers an order for the book of its instrument
+		"""
+		batches = self.pending[shardOf(instrument, self.numShards)]
+		orders = batches.get(instrument)
+		if orders is None:
+			orders = batches[instrument] = []
+		orders.append(order)
+
+	def flush(self):
+		"""
+		Sends every buffered order to its shard and waits for the trades
+		"""
+		pending = self.pending
+		self.pending = [{} for _ in range(self.numShards)]
+		results = []
+		if self.shards:
+			results.extend(self.shards[0].process(list(pending[0].items())))
+		else:
+			busy = []
+			for conn, batches in zip(self.conns, pending):
+				if batches:
+					conn.send(('process', list(batches.items())))
+					busy.append(conn)
+			for conn in busy:
+				results.extend(conn.recv())
+
+		trades = []
+		for instrument, instrumentTrades in results:
+			for trade in instrumentTrades:
+				trades.append((instrument, trade))
+		return trades
+
+	def process(self, orders):
+		"""
+		Submits [(instrument, order)] and flushes them
+		"""
+		for instrument, order in orders:
+			self.submit(instrument, order)
+		return self.flush()
+
+	def top(self, instrument):
+		"""
+		Best bid and ask of an instrument's book
+		"""
+		if self.shards:
+			return self.shards[0].top(instrument)
+		conn = self.conns[shardOf(instrument, self.numShards)]
+		conn.send(('top', instrument))
+		return conn.recv()
+
+	def close(self):
+		for conn in self.conns:
+			conn.send(('close',))
+			conn.close()
+		for process in self.processes:
+			process.join()
+		self.conns = []
+		self.processes = []
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
@@ -0,0 +1,213 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.Orderbook import *
+from OrderMatchingEngine import Wire
+import asyncio
+import struct
+
+# Execution reports sent back to clients, one fixed frame each:
+#   kind B, order id q, quantity q, price q, remaining q, trade seq q
+# ACK:       quantity filled on arrival, remaining, price of the order
+# FILL:      one fill of the order, at price, with the trade's sequence number,
+#            and what is left of the order once its batch is matched
+# CANCELLED: quantity that was resting when the cancel took it out
+# REJECTED:  a cancel for an order that is not resting
+REPORT = struct.Struct('<Bqqqqq')
+
+REPORT_ACK = 0
+REPORT_FILL = 1
+REPORT_CANCELLED = 2
+REPORT_REJECTED = 3
+
+
+def encodeReport(kind, order_id, quantity=0, price=0, remaining=0, seq=-1):
+	return REPORT.pack(kind, order_id, quantity, price or 0, remaining, seq)
+
+
+class Gateway(object):
+	"""
+	Order gateway
+	-------------
+
+	An asyncio TCP server that reads Wire messages from many clients and
+	queues them to one matching task, the only writer of the book. The queue
+	holds at most queueSize messages; when it is full, connection handlers
+	stop reading and TCP pushes back on the clients.
+
+	The matching task takes whatever is queued, up to batchSize messages,
+	runs it through process_batch, and writes execution reports to the
+	connection each order came from. Fills also go to the connection of the
+	resting order they hit.
+
+	Only the connection that placed an order can cancel it, and an order
+	whose id is already live is rejected. So is a frame that does not
+	decode. After each batch the matching task waits, up to drainTimeout
+	seconds, for connections whose output is over the transport's high-water
+	mark; a connection that does not drain in time is closed as a slow
+	consumer.
+	"""
+	def __init__(self, book=None, host='127.0.0.1', port=0, queueSize=10000, batchSize=256, drainTimeout=1.0):
+		self.book = book if book is not None else Orderbook(retainTrades=0)
+		self.host = host
+		self.port = port
+		self.queueSize = queueSize
+		self.batchSize = batchSize
+		self.drainTimeout = drainTimeout
+		self.owners = {}  # resting order id -> writer of its connection
+		self.written = set()  # writers sent to since the last drain
+		self.queue = None
+		self.server = None
+		self.matcher = None
+
+	async def start(self):
+		self.queue = asyncio.Queue(self.queueSize)
+		self.server = await asyncio.start_server(self._serve, self.host, self.port)
+		self.port = self.server.sockets[0].getsockname()[1]
+		self.matcher = asyncio.ensure_future(self._match())
+		return self
+
+	async def close(self):
+		self.server.close()
+		await self.server.wait_closed()
+		self.matcher.cancel()
+		try:
+			await self.matcher
+		except asyncio.CancelledError:
+			pass
+
+	async def _serve(self, reader, writer):
+		try:
+			while True:
+				message = await reader.readexactly(Wire.MESSAGE.size)
+				try:
+					orders = Wire.decode(message)
+				except ValueError:
+					self._send(writer, encodeReport(REPORT_REJECTED, Wire.MESSAGE.unpack(message)[5]))
+					continue
+				for order in orders:
+					await self.queue.put((order, writer))
+		except (asyncio.IncompleteReadError, ConnectionError):
+			pass
+		finally:
+			writer.close()
+
+	async def _match(self):
+		queue = self.queue
+		while True:
+			batch = [await queue.get()]
+			while len(batch) < self.batchSize and not queue.empty():
+				batch.append(queue.get_nowait())
+			self.processBatch(batch)
+			await self._drain()
+
+	async def _drain(self):
+		"""
+		Waits for the connections written to that are over their high-water
+		mark, closing those that do not drain within drainTimeout
+		"""
+		written, self.written = self.written, set()
+		for writer in written:
+			transport = writer.transport
+			if writer.is_closing() or transport.get_write_buffer_size() <= transport.get_write_buffer_limits()[1]:
+				continue
+			try:
+				await asyncio.wait_for(writer.drain(), self.drainTimeout)
+			except asyncio.TimeoutError:
+				writer.close()
+			except ConnectionError:
+				pass
+
+	def _admit(self, batch):
+		"""
+		Flags, for each (order, writer) of batch, whether it goes to the
+		book: cancels only from the connection that placed the order, new
+		orders only with a positive size (and price, for limits) and an id
+		that is not live or earlier in the batch
+		"""
+		live = self.book.orders
+		owners = self.owners
+		placed = {}  # order id -> writer, for new orders earlier in the batch
+		admitted = []
+		for order, writer in batch:
+			order_id = order.order_id
+			if order.__class__ is CancelOrder:
+				owner = placed.get(order_id, owners.get(order_id))
+				admitted.append(owner is writer)
+			elif order.remainingToFill <= 0 or (order.__class__ is LimitOrder and order.price <= 0):
+				admitted.append(False)
+			elif order_id in live or order_id in placed:
+				admitted.append(False)
+			else:
+				placed[order_id] = writer
+				admitted.append(True)
+		return admitted
+
+	def processBatch(self, batch):
+		"""
+		Matches [(order, writer)] and writes the execution reports
+		"""
+		book = self.book
+		owners = self.owners
+		admitted = self._admit(batch)
+		accepted = [item for item, ok in zip(batch, admitted) if ok]
+		reports = book.process_batch([order for order, _ in accepted])
+		nextReport = iter(reports).__next__
+		cancelled = []  # dropped from owners once the batch's fills are routed
+
+		for (order, writer), ok in zip(batch, admitted):
+			if not ok:
+				self._send(writer, encodeReport(REPORT_REJECTED, order.order_id))
+				continue
+			report = nextReport()
+			if order.__class__ is CancelOrder:
+				if report.cancelled is None:
+					self._send(writer, encodeReport(REPORT_REJECTED, order.order_id))
+				else:
+					cancelled.append(order.order_id)
+					self._send(writer, encodeReport(REPORT_CANCELLED, order.order_id,
+													report.cancelled.remainingToFill))
+				continue
+			self._send(writer, encodeReport(REPORT_ACK, order.order_id, report.filled,
+											order.price, report.remaining))
+			if report.resting:
+				owners[order.order_id] = writer
+
+		takers = {report.order.order_id: (writer, report.remaining)
+				  for (_, writer), report in zip(accepted, reports)}
+		filledMakers = set()
+		for trade in book.trades.drain():
+			makerWriter = owners.get(trade.maker_order_id)
+			if makerWriter is not None:
+				maker = book.orders.get(trade.maker_order_id)
+				if maker is None:
+					filledMakers.add(trade.maker_order_id)
+				self._send(makerWriter, encodeReport(REPORT_FILL, trade.maker_order_id, trade.size, trade.price,
+													 maker.remainingToFill if maker is not None else 0, trade.seq))
+			taker = takers.get(trade.taker_order_id)
+			if taker is not None:
+				self._send(taker[0], encodeReport(REPORT_FILL, trade.taker_order_id, trade.size, trade.price,
+												  taker[1], trade.seq))
+		for order_id in filledMakers:
+			owners.pop(order_id, None)
+		for order_id in cancelled:
+			owners.pop(order_id, None)
+
+	def _send(self, writer, data):
+		if not writer.is_closing():
+			writer.write(data)
+			self.written.add(writer)
+
+
+async def serve(host='127.0.0.1', port=9000, **kwargs):
+	"""
+	Runs a gateway until cancelled
+	"""
+	gateway = await Gateway(host=host, port=port, **kwargs).start()
+	print(f"Gateway listening on {gateway.host}:{gateway.port}")
+	try:
+		await asyncio.Event().wait()
+	finally:
+		await gateway.close()
+
+
+if __name__ == "__main__":
+	asyncio.run(serve())
@@ -0,0 +1,381 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.Orderbook import *
+from zlib import crc32
+import threading
+import struct
+import time
+import os
+
+# Every record is a frame header followed by its payload:
+#   header   <II    payload length, crc32 of payload
+#   payload  <B     message kind, then
+#     cancel        <q      order id
+#     market/limit  <qBqqq  order id, side, size, remaining, price (0 for market)
+#                   then trader_id, signature_type, v, r, s as tagged values
+# Orders whose id, size or price is not a 64-bit int (floats, strings, big
+# ints) are written with KIND_WIDE added to their kind, and every field as
+# a tagged value: order id for a cancel; otherwise order id, side, size,
+# remaining, price, trader_id, signature_type, v, r, s.
+HEADER = struct.Struct('<II')
+KIND = struct.Struct('<B')
+CANCEL = struct.Struct('<q')
+ORDER = struct.Struct('<qBqqq')
+SHORT = struct.Struct('<H')
+INT = struct.Struct('<q')
+FLOAT = struct.Struct('<d')
+
+KIND_LIMIT = 0
+KIND_MARKET = 1
+KIND_CANCEL = 2
+KIND_WIDE = 4
+
+SIDES = (Side.BUY, Side.SELL)
+
+# Tags of the variable-length values
+TAG_NONE = 0
+TAG_STR = 1
+TAG_BYTES = 2
+TAG_INT = 3
+TAG_FLOAT = 4
+TAG_BIGINT = 5  # ints beyond 64 bits, as signed little-endian bytes
+
+
+def packValue(value, out):
+	if value is None:
+		out.append(TAG_NONE)
+	elif isinstance(value, str):
+		data = value.encode()
+		out.append(TAG_STR)
+		out += SHORT.pack(len(data))
+		out += data
+	elif isinstance(value, (bytes, bytearray)):
+		out.append(TAG_BYTES)
+		out += SHORT.pack(len(value))
+		out += value
+	elif isinstance(value, int):
+		try:
+			data = INT.pack(value)
+		except struct.error:
+			data = value.to_bytes(value.bit_length() // 8 + 1, 'little', signed=True)
+			out.append(TAG_BIGINT)
+			out += SHORT.pack(len(data))
+		else:
+			out.append(TAG_INT)
+		out += data
+	elif isinstance(value, float):
+		out.append(TAG_FLOAT)
+		out += FLOAT.pack(value)
+	else:
+		raise TypeError(f"cannot journal a {value.__class__.__name__} value")
+
+
+def unpackValue(buffer, offset):
+	"""
+	Returns the value at offset and the offset after it
+	"""
+	tag = buffer[offset]
+	offset += 1
+	if tag == TAG_NONE:
+		return None, offset
+	if tag == TAG_INT:
+		return INT.unpack_from(buffer, offset)[0], offset + 8
+	if tag == TAG_FLOAT:
+		return FLOAT.unpack_from(buffer, offset)[0], offset + 8
+	length = SHORT.unpack_from(buffer, offset)[0]
+	offset += 2
+	data = bytes(buffer[offset:offset + length])
+	if tag == TAG_STR:
+		return data.decode(), offset + length
+	if tag == TAG_BIGINT:
+		return int.from_bytes(data, 'little', signed=True), offset + length
+	return data, offset + length
+
+
+def encodeOrder(order):
+	"""
+	Encodes a limit, market or cancel order as a journal payload
+	"""
+	cls = order.__class__
+	if cls is CancelOrder:
+		try:
+			return KIND.pack(KIND_CANCEL) + CANCEL.pack(order.order_id)
+		except struct.error:
+			return _encodeWide(KIND_CANCEL, (('order_id', order.order_id),))
+	if cls is LimitOrder:
+		kind = KIND_LIMIT
+		price = order.price
+	elif cls is MarketOrder:
+		kind = KIND_MARKET
+		price = 0
+	else:
+		raise TypeError(f"cannot journal {cls.__name__}")
+	try:
+		out = bytearray(KIND.pack(kind))
+		out += ORDER.pack(order.order_id, order.side.value, order.size, order.remainingToFill, price)
+	except struct.error:
+		return _encodeWide(kind, (('order_id', order.order_id), ('side', order.side.value),
+								  ('size', order.size), ('remainingToFill', order.remainingToFill),
+								  ('price', price), ('trader_id', order.trader_id),
+								  ('signature_type', order.signature_type),
+								  ('v', order.v), ('r', order.r), ('s', order.s)))
+	for value in (order.trader_id, order.signature_type, order.v, order.r, order.s):
+		packValue(value, out)
+	return bytes(out)
+
+
+def _encodeWide(kind, fields):
+	"""
+	Encodes (name, value) fields as tagged values under kind + KIND_WIDE
+	"""
+	out = bytearray(KIND.pack(kind + KIND_WIDE))
+	for name, value in fields:
+		try:
+			packValue(value, out)
+		except TypeError as e:
+			raise TypeError(f"cannot journal {name}={value!r}: {e}") from None
+	return bytes(out)
+
+
+def decodeOrder(payload):
+	"""
+	Rebuilds the order encoded by encodeOrder
+	"""
+	kind = payload[0]
+	if kind == KIND_CANCEL:
+		return CancelOrder(CANCEL.unpack_from(payload, 1)[0])
+	if kind & KIND_WIDE:
+		kind -= KIND_WIDE
+		order_id, offset = unpackValue(payload, 1)
+		if kind == KIND_CANCEL:
+			return CancelOrder(order_id)
+		side, offset = unpackValue(payload, offset)
+		size, offset = unpackValue(payload, offset)
+		remaining, offset = unpackValue(payload, offset)
+		price, offset = unpackValue(payload, offset)
+	else:
+		order_id, side, size, remaining, price = ORDER.unpack_from(payload, 1)
+		offset = 1 + ORDER.size
+	trader_id, offset = unpackValue(payload, offset)
+	signature_type, offset = unpackValue(payload, offset)
+	v, offset = unpackValue(payload, offset)
+	r, offset = unpackValue(payload, offset)
+	s, offset = unpackValue(payload, offset)
+	if kind == KIND_LIMIT:
+		order = LimitOrder(order_id, SIDES[side], size, price, trader_id, signature_type, v, r, s)
+	else:
+		order = MarketOrder(order_id, SIDES[side], size, trader_id, signature_type, v, r, s)
+	order.remainingToFill = remaining
+	return order
+
+
+def isTornTail(buffer, offset):
+	"""
+	Whether what follows the last intact record, at offset, is one record
+	cut short or left corrupt by a crash during the final write, rather than
+	corruption with more data after it
+	"""
+	end = len(buffer)
+	if offset + HEADER.size > end:
+		return True
+	length = HEADER.unpack_from(buffer, offset)[0]
+	return offset + HEADER.size + length >= end
+
+
+def readRecords(buffer):
+	"""
+	Yields (payload, end offset) for every intact record in buffer. Stops
+	at the first short or corrupt record, which is a torn write.
+	"""
+	view = memoryview(buffer)
+	offset = 0
+	end = len(view)
+	while offset + HEADER.size <= end:
+		length, checksum = HEADER.unpack_from(view, offset)
+		start = offset + HEADER.size
+		if start + length > end:
+			return
+		payload = view[start:start + length]
+		if crc32(payload) != checksum:
+			return
+		offset = start + length
+		yield payload, offset
+
+
+class Journal(object):
+	"""
+	Write-ahead order journal
+	-------------------------
+
+	Append-only binary log of every message an Orderbook accepts, written
+	before it is matched. Records are buffered and written with a single
+	fsync once groupSize records are waiting or groupInterval seconds have
+	passed since the last commit (group commit). With autoFlush, a
+	background thread also commits records that have waited groupInterval,
+	so the tail of a burst does not sit in the buffer while the book is
+	idle.
+
+	A message is only durable after the commit that covers it. append and
+	extend return the byte offset after their last record, and durable is
+	the offset covered by the last fsync, so acknowledgements can be held
+	until durable reaches the offset of their message (see waitDurable).
+
+	Opening an existing journal cuts off a torn record at its end, left by a
+	crash during a write, and appends after the last intact record. A
+	corrupt record with more data after it is not a torn write, so opening
+	raises ValueError rather than discard the records that follow.
+	"""
+	def __init__(self, path, groupSize=512, groupInterval=0.005, fsync=True, autoFlush=True):
+		self.path = path
+		self.groupSize = groupSize
+		self.groupInterval = groupInterval
+		self.fsync = fsync
+		self.buffer = bytearray()
+		self.buffered = 0
+		self.commits = 0
+		self.lastCommit = time.monotonic()
+		self.lock = threading.Lock()
+		self.committed = threading.Condition(self.lock)
+
+		self.file = open(path, 'ab+')
+		self.file.seek(0)
+		data = self.file.read()
+		validEnd = 0
+		for _, validEnd in readRecords(data):
+			pass
+		if validEnd < len(data):
+			if not isTornTail(data, validEnd):
+				self.file.close()
+				raise ValueError(f"corrupt journal record at byte {validEnd} of {path}, "
+								 f"followed by {len(data) - validEnd} more bytes")
+			self.file.truncate(validEnd)
+		self.file.seek(validEnd)
+		self.durable = validEnd  # byte offset covered by the last fsync
+
+		self.closed = threading.Event()
+		self.flusher = None
+		if autoFlush and groupInterval:
+			self.flusher = threading.Thread(target=self._flushLoop, name='journal-flush', daemon=True)
+			self.flusher.start()
+
+	def append(self, order):
+		"""
+		Buffers one message, committing the group if it is due. Returns the
+		byte offset after the message.
+		"""
+		payload = encodeOrder(order)
+		with self.lock:
+			self.buffer += HEADER.pack(len(payload), crc32(payload))
+			self.buffer += payload
+			self.buffered += 1
+			end = self.durable + len(self.buffer)
+			if self.buffered >= self.groupSize or time.monotonic() - self.lastCommit >= self.groupInterval:
+				self._commit()
+		return end
+
+	def extend(self, orders):
+		"""
+		Buffers many messages and commits them together. Returns the byte
+		offset after the last one.
+		"""
+		records = bytearray()
+		count = 0
+		for order in orders:
+			payload = encodeOrder(order)
+			records += HEADER.pack(len(payload), crc32(payload))
+			records += payload
+			count += 1
+		with self.lock:
+			self.buffer += records
+			self.buffered += count
+			self._commit()
+			return self.durable
+
+	def commit(self):
+		"""
+		Writes the buffered messages and fsyncs them
+		"""
+		with self.lock:
+			self._commit()
+
+	def _commit(self):
+		# the caller holds the lock
+		if self.buffered:
+			self.file.write(self.buffer)
+			self.file.flush()
+			if self.fsync:
+				os.fsync(self.file.fileno())
+			self.durable += len(self.buffer)
+			self.buffer = bytearray()
+			self.buffered = 0
+			self.commits += 1
+			self.committed.notify_all()
+		self.lastCommit = time.monotonic()
+
+	def _flushLoop(self):
+		"""
+		Commits messages that have waited groupInterval, until close
+		"""
+		while not self.closed.wait(self.groupInterval):
+			with self.lock:
+				if self.buffered and time.monotonic() - self.lastCommit >= self.groupInterval:
+					self._commit()
+
+	def waitDurable(self, offset, timeout=None):
+		"""
+		Blocks until the messages up to byte offset are committed, or
+		timeout seconds pass. Returns whether they are.
+		"""
+		with self.lock:
+			return self.committed.wait_for(lambda: self.durable >= offset, timeout)
+
+	def position(self):
+		"""
+		Commits and returns the byte offset after the last message
+		"""
+		self.commit()
+		return self.durable
+
+	def close(self):
+		self.closed.set()
+		if self.flusher is not None:
+			self.flusher.join()
+		self.commit()
+		self.file.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		self.close()
+
+
+def readJournal(path):
+	"""
+	Returns every message in a journal, in order, as orders
+	"""
+	with open(path, 'rb') as f:
+		data = f.read()
+	return [decodeOrder(payload) for payload, _ in readRecords(data)]
+
+
+def replay(path, book=None, chunkSize=65536, offset=0):
+	"""
+	Rebuilds an Orderbook, and its trade log, from a journal
+
+	The messages from byte offset on are fed to book.process_batch in chunks
+	without reports, so book must not have a journal attached yet. Returns
+	the book.
+	"""
+	if book is None:
+		book = Orderbook()
+	with open(path, 'rb') as f:
+		f.seek(offset)
+		data = f.read()
+	chunk = []
+	for payload, _ in readRecords(data):
+		chunk.append(decodeOrder(payload))
+		if len(chunk) >= chunkSize:
+			book.process_batch(chunk, reports=False)
+			chunk = []
+	book.process_batch(chunk, reports=False)
+	return book
@@ -0,0 +1,90 @@
+from OrderMatchingEngine.Order import *
+
+
+class DepthUpdate(object):
+	"""
+	Depth update
+	------------
+
+	The new total volume of one price level; 0 means the level is gone.
+	"""
+	__slots__ = ('seq', 'side', 'price', 'size')
+
+	def __init__(self, seq, side, price, size):
+		self.seq = seq
+		self.side = side
+		self.price = price
+		self.size = size
+
+	def __repr__(self):
+		return f"DepthUpdate(seq={self.seq}, side={self.side}, price={self.price}, size={self.size})"
+
+
+class TopOfBook(object):
+	"""
+	Top of book
+	-----------
+
+	Best bid and ask with the volume at each; prices are None for an empty
+	side.
+	"""
+	__slots__ = ('seq', 'bid', 'bidSize', 'ask', 'askSize')
+
+	def __init__(self, seq, bid, bidSize, ask, askSize):
+		self.seq = seq
+		self.bid = bid
+		self.bidSize = bidSize
+		self.ask = ask
+		self.askSize = askSize
+
+	def __repr__(self):
+		return f"TopOfBook(seq={self.seq}, bid={self.bidSize}@{self.bid}, ask={self.askSize}@{self.ask})"
+
+
+class MarketDataFeed(object):
+	"""
+	Market data feed
+	----------------
+
+	Incremental L2 feed of an Orderbook. The book publishes a DepthUpdate for
+	each price level whose volume a message changed, and a TopOfBook when the
+	best bid or ask, or the volume at either, changed. Both share one
+	sequence number, so a consumer applying them in order after
+	Orderbook.depth() keeps an exact copy of the levels it tracks.
+
+	Updates go to listener when one is given, otherwise they are kept until
+	drain() is called.
+	"""
+	def __init__(self, listener=None):
+		self.listener = listener
+		self.updates = []
+		self.seq = 0
+		self.lastTop = (None, 0, None, 0)
+
+	def publish(self, update):
+		if self.listener is not None:
+			self.listener(update)
+		else:
+			self.updates.append(update)
+
+	def level(self, side, price, size):
+		self.seq += 1
+		self.publish(DepthUpdate(self.seq, side, price, size))
+
+	def topOfBook(self, book):
+		bid = book.bids.best
+		ask = book.asks.best
+		top = (bid.price if bid is not None else None, bid.volume if bid is not None else 0,
+			   ask.price if ask is not None else None, ask.volume if ask is not None else 0)
+		if top != self.lastTop:
+			self.lastTop = top
+			self.seq += 1
+			self.publish(TopOfBook(self.seq, *top))
+
+	def drain(self):
+		"""
+		Returns and forgets the updates kept so far
+		"""
+		updates = self.updates
+		self.updates = []
+		return updates
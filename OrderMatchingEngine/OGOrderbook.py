@@ -5,6 +5,10 @@ from typing import List, Union
 from time import time
 
 
+def _sortKey(order):
+	return sortKey(order.side, order.price, order.seq)
+
+
 class Orderbook(object):
 	"""
 	An orderbook.
@@ -13,9 +17,10 @@ class Orderbook(object):
 	It can store and process orders.
 	"""
 	def __init__(self):
-		self.bids: SortedList[Order] = SortedList()
-		self.asks: SortedList[Order] = SortedList()
+		self.bids: SortedList[Order] = SortedList(key=_sortKey)
+		self.asks: SortedList[Order] = SortedList(key=_sortKey)
 		self.trades = []
+		self.nextOrderSeq = 0
 
 	def processOrder(self, incomingOrder):
 		"""
@@ -27,6 +32,13 @@ class Orderbook(object):
 		- Cancel Order
 		"""
 
+		if (incomingOrder.__class__ == LimitOrder and incomingOrder.price.__class__ is not int
+				and self.bids.key is _sortKey):
+			# sortKey needs integer ticks, so both sides sort on the priority
+			# tuple from the first price that is not one
+			self.bids = SortedList(self.bids, key=LimitOrder._priority)
+			self.asks = SortedList(self.asks, key=LimitOrder._priority)
+
 		if incomingOrder.__class__ == CancelOrder:
 			for order in self.bids:
 				if incomingOrder.order_id == order.order_id:
@@ -92,6 +104,8 @@ class Orderbook(object):
 				break
 
 		if incomingOrder.remainingToFill > 0 and incomingOrder.__class__ == LimitOrder:
+			incomingOrder.seq = self.nextOrderSeq
+			self.nextOrderSeq += 1
 			if incomingOrder.side == Side.BUY:
 				self.bids.add(incomingOrder)
 			else:
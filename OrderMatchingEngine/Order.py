@@ -1,20 +1,36 @@
 from enum import Enum
-from time import time
 import secrets
 
 class Side(Enum):
     BUY = 0
     SELL = 1
 
+# Sequence numbers below 2**SEQ_BITS fit under one tick of the sort key
+SEQ_BITS = 40
+
+def sortKey(side, price, seq):
+    """
+    Price-time priority of a resting limit order as one int: lower is
+    better on both sides, so sorted containers compare keys natively
+    instead of calling LimitOrder.__lt__. price must be in integer ticks
+    and seq an int, otherwise it raises TypeError.
+    """
+    return ((-price if side == Side.BUY else price) << SEQ_BITS) + seq
+
 class Order(object):
-    def __init__(self, order_id: int, side: Side, price=None, size=None, trader_id=None, signature_type='EIP-712', v=None, r=None, s=None):
+    # seq is the time priority, assigned by the Orderbook when it accepts the
+    # order; it is None until then
+    __slots__ = ('order_id', 'side', 'price', 'size', 'remainingToFill', 'trader_id', 'seq',
+                 'signature_type', 'v', 'r', 's')
+
+    def __init__(self, order_id: int, side: Side = None, price=None, size=None, trader_id=None, signature_type='EIP-712', v=None, r=None, s=None):
         self.order_id = order_id
         self.side = side
         self.price = price
         self.size = size
         self.remainingToFill = size
         self.trader_id = trader_id
-        self.time = int(1e6 * time())
+        self.seq = None
         self.signature_type = signature_type
         self.v = v
         self.r = r
@@ -34,6 +50,8 @@ class Order(object):
 
 
 class CancelOrder(Order):
+    __slots__ = ()
+
     def __init__(self, order_id):
         super().__init__(order_id)
 
@@ -42,6 +60,8 @@ class CancelOrder(Order):
 
 
 class MarketOrder(Order):
+    __slots__ = ()
+
     def __init__(self, order_id: int, side: Side, size: int, trader_id=None, signature_type='EIP-712', v=None, r=None, s=None):
         super().__init__(order_id, side, None, size, trader_id, signature_type, v, r, s)
         self.side = side
@@ -54,20 +74,25 @@ class MarketOrder(Order):
 
 
 class LimitOrder(MarketOrder):
+    __slots__ = ()
+
     def __init__(self, order_id: int, side: Side, size: int, price: int, trader_id=None, signature_type='EIP-712', v=None, r=None, s=None):
         super().__init__(order_id, side, size, trader_id, signature_type, v, r, s)
         self.price = price
     
     def __lt__(self, other):
-        if self.price != other.price:
-            if self.side == Side.BUY:
-                return self.price > other.price
-            else:
-                return self.price < other.price
-        elif self.time != other.time:
-             return self.time < other.time
-        elif self.size != other.size:
-            return self.size < other.size
+        try:
+            return sortKey(self.side, self.price, self.seq) < sortKey(other.side, other.price, other.seq)
+        except TypeError:
+            # non-integer prices, or orders no book has accepted yet
+            return self._priority() < other._priority()
+
+    def _priority(self):
+        """
+        Price-time priority as a tuple, for any comparable price; orders
+        without a seq rank after those with one at the same price
+        """
+        return (-self.price if self.side == Side.BUY else self.price, self.seq is None, self.seq or 0)
 
     def __repr__(self):
         return 'Limit Order: {0} {1} units at {2}.'.format(
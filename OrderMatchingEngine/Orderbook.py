@@ -1,21 +1,74 @@
 from OrderMatchingEngine.Order import *
 from OrderMatchingEngine.Trade import *
-from sortedcontainers import SortedList
+from OrderMatchingEngine.PriceLevel import *
+from OrderMatchingEngine.TradeLog import *
+from OrderMatchingEngine.MarketData import *
+from OrderMatchingEngine.Stats import *
+from OrderMatchingEngine.Profiler import *
 from typing import List, Union
 from time import time
 
 
+class ExecutionReport(object):
+	"""
+	Execution report
+	----------------
+
+	The outcome of one order in Orderbook.process_batch: the volume filled,
+	the volume left, whether that remainder rests in the book, and the
+	sequence numbers of its fills in the trade log. For a cancel, cancelled
+	is the resting order that was removed, or None if there was none.
+	rejected is set when the order's id was still resting in the book, in
+	which case nothing was matched or rested.
+	"""
+	__slots__ = ('order', 'filled', 'remaining', 'resting', 'trades', 'cancelled', 'rejected')
+
+	def __init__(self, order, filled, remaining, resting, trades, cancelled=None, rejected=False):
+		self.order = order
+		self.filled = filled
+		self.remaining = remaining
+		self.resting = resting
+		self.trades = trades
+		self.cancelled = cancelled
+		self.rejected = rejected
+
+	def __repr__(self):
+		return (f"ExecutionReport(order_id={self.order.order_id}, filled={self.filled}, "
+				f"remaining={self.remaining}, resting={self.resting}, trades={len(self.trades)})")
+
+
 class Orderbook(object):
 	"""
 	An orderbook.
 	-------------
 
-	It can store and process orders.
+	It can store and process orders. Each side is a book of price levels, and
+	each level keeps its orders in a FIFO queue. Every limit and market order
+	gets the next sequence number (seq) when it is matched, its exact time
+	priority. Resting orders are indexed by order id, so they can be found
+	and cancelled without scanning the book.
+
+	The price levels of each side live in a sorted map chosen by backend (see
+	PriceLevel.BACKENDS); 'skiplist' swaps in the SkipList. Fills go to a
+	columnar TradeLog, which keeps at most retainTrades drained trades.
+
+	With a journal (see Journal.Journal) every accepted message is appended
+	to it before it is matched. With a feed (see MarketData.MarketDataFeed)
+	every change to a price level's volume and to the top of the book is
+	published to it. enableStats() turns on latency histograms and counters,
+	read with stats(), and enableProfiling() per-phase timing of sampled
+	matches.
 	"""
-	def __init__(self):
-		self.bids: SortedList[Order] = SortedList()
-		self.asks: SortedList[Order] = SortedList()
-		self.trades = []
+	def __init__(self, backend='sortedlist', retainTrades=None, journal=None, feed=None):
+		self.bids: BookSide = BookSide(Side.BUY, backend)
+		self.asks: BookSide = BookSide(Side.SELL, backend)
+		self.orders = {}
+		self.trades: TradeLog = TradeLog(retainTrades)
+		self.journal = journal
+		self.feed = feed
+		self.nextOrderSeq = 0
+		self.engineStats = None
+		self.profiler = None
 
 	def processOrder(self, incomingOrder):
 		"""
@@ -25,114 +78,318 @@ class Orderbook(object):
 		- Market Order
 		- Limit Order
 		- Cancel Order
+
+		Raises ValueError for a market or limit order whose id is still
+		resting; the book is left as it was.
 		"""
+		if self.journal is not None:
+			self.journal.append(incomingOrder)
 
 		if incomingOrder.__class__ == CancelOrder:
-			for order in self.bids:
-				if incomingOrder.order_id == order.order_id:
-					self.bids.discard(order)
-					break
-
-			for order in self.asks:
-				if incomingOrder.order_id == order.order_id:
-					self.asks.discard(order)
-					break
-			
+			self._cancel(incomingOrder.order_id)
 			return # Exiting process order
 
-		def whileClause():
-			"""
-			Determined whether to continue the while-loop
-			"""
-			if incomingOrder.side==Side.BUY:
-				if incomingOrder.__class__ == LimitOrder:
-					return len(self.asks) > 0 and incomingOrder.price >= self.asks[0].price # Limit order on the BUY side
-				elif incomingOrder.__class__ == MarketOrder:
-					return len(self.asks) > 0 # Market order on the BUY side
+		if incomingOrder.__class__ == LimitOrder:
+			resting = self._match(incomingOrder, True)
+		elif incomingOrder.__class__ == MarketOrder:
+			resting = self._match(incomingOrder, False)
+		else:
+			return
+		if resting is None:
+			raise ValueError(f"order id {incomingOrder.order_id!r} is already resting")
+
+	def process_batch(self, orders, reports=True):
+		"""
+		Processes an iterable of orders in sequence
+
+		Returns one ExecutionReport per order, in the same order. With reports
+		set to False nothing is returned, which saves an allocation per order.
+		A journal gets the whole batch in one group commit before matching.
+		"""
+		if self.journal is not None:
+			orders = list(orders)
+			self.journal.extend(orders)
+
+		cancel = self._cancel
+		match = self._match
+		if not reports:
+			for order in orders:
+				cls = order.__class__
+				if cls is LimitOrder:
+					match(order, True)
+				elif cls is CancelOrder:
+					cancel(order.order_id)
+				elif cls is MarketOrder:
+					match(order, False)
+			return None
+
+		reports = []
+		append = reports.append
+		trades = self.trades
+
+		for order in orders:
+			cls = order.__class__
+			firstTrade = trades.nextSeq
+			if cls is CancelOrder:
+				cancelled = cancel(order.order_id)
+				append(ExecutionReport(order, 0, 0, False, range(firstTrade, firstTrade), cancelled))
+				continue
+
+			before = order.remainingToFill
+			if cls is LimitOrder:
+				resting = match(order, True)
+			elif cls is MarketOrder:
+				resting = match(order, False)
 			else:
-				if incomingOrder.__class__ == LimitOrder:
-					return len(self.bids) > 0 and incomingOrder.price <= self.bids[0].price # Limit order on the SELL side
-				elif incomingOrder.__class__ == MarketOrder:
-					return len(self.bids) > 0 # Market order on the SELL side
+				resting = False
+			if resting is None:
+				append(ExecutionReport(order, 0, before, False, range(firstTrade, firstTrade), None, True))
+				continue
+			append(ExecutionReport(order, before - order.remainingToFill, order.remainingToFill,
+								   resting, range(firstTrade, trades.nextSeq)))
+		return reports
+
+	def _cancel(self, order_id):
+		"""
+		Removes a resting order, returning it or None if there was none
+		"""
+		bookOrder = self.orders.pop(order_id, None)
+		if bookOrder is not None:
+			book = self.bids if bookOrder.side == Side.BUY else self.asks
+			level = book.remove(bookOrder)
+			if self.feed is not None:
+				self.feed.level(book.side, level.price, level.volume)
+				self.feed.topOfBook(self)
+		return bookOrder
+
+	def _match(self, incomingOrder, isLimit, mark=None, clock=None):
+		"""
+		Matches an incoming market or limit order against the other side, and
+		rests what is left of a limit order. Returns whether it rested, or
+		None without touching the book if the order's id is still resting.
+
+		mark, when given, is called with the name of each phase as it ends
+		(see Profiler.PhaseProfiler); unprofiled matches pass None.
+		"""
+		orders = self.orders
+		if incomingOrder.order_id in orders:
+			return None
+		incomingOrder.seq = self.nextOrderSeq
+		self.nextOrderSeq += 1
+		isBuy = incomingOrder.side == Side.BUY
+		book = self.asks if isBuy else self.bids
+		limitPrice = incomingOrder.price
+		trades = self.trades
+		feed = self.feed
+		lastLevel = None
 
 		# while there are orders and the orders requirements are matched
-		while whileClause():
-			bookOrder = None
-			if incomingOrder.side == Side.BUY:
-				bookOrder = self.asks.pop(0)
-				buyer_id = incomingOrder.trader_id
-				seller_id = bookOrder.trader_id
-				v_buyer, r_buyer, s_buyer = incomingOrder.v, incomingOrder.r, incomingOrder.s
-				v_seller, r_seller, s_seller = bookOrder.v, bookOrder.r, bookOrder.s
-			else:
-				bookOrder = self.bids.pop(0)
-				buyer_id = bookOrder.trader_id
-				seller_id = incomingOrder.trader_id
-				v_buyer, r_buyer, s_buyer = bookOrder.v, bookOrder.r, bookOrder.s
-				v_seller, r_seller, s_seller = incomingOrder.v, incomingOrder.r, incomingOrder.s
-
-			if incomingOrder.remainingToFill == bookOrder.remainingToFill:  # if the same volume
-				volume = incomingOrder.remainingToFill
-				incomingOrder.remainingToFill -= volume
-				bookOrder.remainingToFill -= volume
-				trade = Trade(bookOrder.order_id, incomingOrder.order_id,
-                              bookOrder.price, volume, buyer_id, seller_id,
-                              incomingOrder.signature_type,
-                              v_buyer, r_buyer, s_buyer,
-                              v_seller, r_seller, s_seller)
-				self.trades.append(trade)
+		while book.best is not None:
+			level = book.best
+			if isLimit and (limitPrice < level.price if isBuy else limitPrice > level.price):
 				break
+			if mark is not None:
+				mark(('cross', clock()))
+			if feed is not None and level is not lastLevel:
+				if lastLevel is not None:
+					feed.level(book.side, lastLevel.price, lastLevel.volume)
+				lastLevel = level
+				if mark is not None:
+					mark(('feed', clock()))
 
-			elif incomingOrder.remainingToFill > bookOrder.remainingToFill:  # incoming has greater volume
-				volume = bookOrder.remainingToFill
-				incomingOrder.remainingToFill -= volume
-				bookOrder.remainingToFill -= volume
-				trade = Trade(bookOrder.order_id, incomingOrder.order_id,
-                              bookOrder.price, volume, buyer_id, seller_id,
-                              incomingOrder.signature_type,
-                              v_buyer, r_buyer, s_buyer,
-                              v_seller, r_seller, s_seller)
-				self.trades.append(trade)
-
-			elif incomingOrder.remainingToFill < bookOrder.remainingToFill:  # book has greater volume
-				volume = incomingOrder.remainingToFill
-				incomingOrder.remainingToFill -= volume
-				bookOrder.remainingToFill -= volume
-				trade = Trade(bookOrder.order_id, incomingOrder.order_id,
-                              bookOrder.price, volume, buyer_id, seller_id,
-                              incomingOrder.signature_type,
-                              v_buyer, r_buyer, s_buyer,
-                              v_seller, r_seller, s_seller)
-				self.trades.append(trade)
-
-				if bookOrder.side == Side.SELL:
-					self.asks.add(bookOrder)
-				else:
-					self.bids.add(bookOrder)
+			bookOrder = next(iter(level.orders))
+			volume = min(incomingOrder.remainingToFill, bookOrder.remainingToFill)
+			# log the fill first, so a rejected fill leaves the book as it was
+			trades.append(bookOrder, incomingOrder, bookOrder.price, volume)
+			if mark is not None:
+				mark(('trade', clock()))
+			incomingOrder.remainingToFill -= volume
+			bookOrder.remainingToFill -= volume
+			level.volume -= volume
+			if mark is not None:
+				mark(('fill', clock()))
+
+			if bookOrder.remainingToFill > 0:  # book has greater volume, it stays at the head of its level
+				break
+
+			level.orders.popitem(last=False)
+			book.count -= 1
+			if orders.get(bookOrder.order_id) is bookOrder:
+				del orders[bookOrder.order_id]
+			if not level.orders:
+				book.removeLevel(level)
+			if mark is not None:
+				mark(('pop', clock()))
+			if incomingOrder.remainingToFill == 0:  # if the same volume
 				break
+		if mark is not None:
+			mark(('cross', clock()))
+
+		resting = incomingOrder.remainingToFill > 0 and isLimit
+		if resting:
+			orders[incomingOrder.order_id] = incomingOrder
+			restingLevel = (self.bids if isBuy else self.asks).add(incomingOrder)
+			if mark is not None:
+				mark(('rest', clock()))
+
+		if feed is not None:
+			if lastLevel is not None:
+				feed.level(book.side, lastLevel.price, lastLevel.volume)
+			if resting:
+				feed.level(incomingOrder.side, restingLevel.price, restingLevel.volume)
+			feed.topOfBook(self)
+			if mark is not None:
+				mark(('feed', clock()))
+		return resting
+
+	def enableStats(self, stats=None):
+		"""
+		Starts recording into stats (a new Stats.EngineStats when None)
+
+		The instrumented _match and _cancel are bound on this instance,
+		shadowing the class methods that processOrder and process_batch call;
+		with stats and profiling off nothing is timed or counted.
+		"""
+		self.engineStats = stats if stats is not None else EngineStats()
+		self._bindInstrumentation()
+		return self.engineStats
+
+	def disableStats(self):
+		self.engineStats = None
+		self._bindInstrumentation()
+
+	def enableProfiling(self, profiler=None):
+		"""
+		Starts sampling matches into profiler (a new Profiler.PhaseProfiler
+		when None). Stats and profiling share one instrumented _match, so
+		they can be enabled and disabled in any order, and sampled orders are
+		counted in the stats too.
+		"""
+		self.profiler = profiler if profiler is not None else PhaseProfiler()
+		self._bindInstrumentation()
+		return self.profiler
+
+	def disableProfiling(self):
+		self.profiler = None
+		self._bindInstrumentation()
 
-		if incomingOrder.remainingToFill > 0 and incomingOrder.__class__ == LimitOrder:
-			if incomingOrder.side == Side.BUY:
-				self.bids.add(incomingOrder)
+	def _bindInstrumentation(self):
+		# del rather than self.__dict__, which would turn the instance's
+		# inline attributes into a dict and slow every self.x lookup after
+		if self.engineStats is not None or self.profiler is not None:
+			self._match = self._instrumentedMatch
+		else:
+			try:
+				del self._match
+			except AttributeError:
+				pass
+		if self.engineStats is not None:
+			self._cancel = self._timedCancel
+		else:
+			try:
+				del self._cancel
+			except AttributeError:
+				pass
+
+	def _instrumentedMatch(self, incomingOrder, isLimit):
+		profiler = self.profiler
+		stats = self.engineStats
+		sample = False
+		if profiler is not None:
+			if profiler.countdown > 1:
+				profiler.countdown -= 1
 			else:
-				self.asks.add(incomingOrder)
+				profiler.countdown = profiler.sampleEvery
+				sample = True
+		if stats is None and not sample:
+			return Orderbook._match(self, incomingOrder, isLimit)
+
+		if stats is not None:
+			trades = self.trades
+			firstTrade = trades.nextSeq
+			start = stats.clock()
+		if sample:
+			clock = profiler.clock
+			marks = []
+			sampleStart = clock()
+			resting = Orderbook._match(self, incomingOrder, isLimit, marks.append, clock)
+			profiler.record('limit' if isLimit else 'market', incomingOrder.order_id, sampleStart, marks)
+		else:
+			resting = Orderbook._match(self, incomingOrder, isLimit)
+		if stats is None:
+			return resting
+
+		stats.latency['limit' if isLimit else 'market'].record(stats.clock() - start)
+		fills = trades.nextSeq - firstTrade
+		stats.fills += fills
+		levels = 0
+		if fills:
+			# fills walk the levels in price order, so count the price changes
+			prices = trades.prices
+			first = firstTrade - trades.base
+			levels = 1
+			for i in range(first + 1, first + fills):
+				if prices[i] != prices[i - 1]:
+					levels += 1
+		stats.levelsWalked.record(levels)
+		return resting
+
+	def _timedCancel(self, order_id):
+		stats = self.engineStats
+		start = stats.clock()
+		bookOrder = Orderbook._cancel(self, order_id)
+		stats.latency['cancel'].record(stats.clock() - start)
+		if bookOrder is None:
+			stats.cancelMisses += 1
+		return bookOrder
+
+	def stats(self):
+		"""
+		Snapshot for exporters: book depth and trade count always, plus the
+		EngineStats snapshot while stats are enabled
+		"""
+		snapshot = {
+			'bidLevels': len(self.bids.levels),
+			'askLevels': len(self.asks.levels),
+			'restingOrders': len(self.orders),
+			'trades': self.trades.nextSeq,
+		}
+		if self.engineStats is not None:
+			snapshot.update(self.engineStats.snapshot())
+		return snapshot
+
+	def depth(self, levels=10):
+		"""
+		Consolidated depth of the first levels price levels on each side, as
+		{'bids': [(price, volume, order count)], 'asks': [...], 'seq': n}
+		where seq is the feed's last sequence number, if there is a feed
+		"""
+		return {
+			'bids': self.bids.depth(levels),
+			'asks': self.asks.depth(levels),
+			'seq': self.feed.seq if self.feed is not None else None,
+		}
+
+	def getOrder(self, order_id):
+		"""
+		Returns the resting order with the given id, or None
+		"""
+		return self.orders.get(order_id)
 
-	def getBid(self): return self.bids[0].price if len(self.bids)>0 else None
-	def getAsk(self): return self.asks[0].price if len(self.asks)>0 else None
+	def getBid(self): return self.bids.best.price if self.bids.best is not None else None
+	def getAsk(self): return self.asks.best.price if self.asks.best is not None else None
 
 	def __repr__(self):
 		lines = []
 		lines.append("-"*5 + "OrderBook" + "-"*5)
 
 		lines.append("\nAsks:")
-		asks = self.asks.copy()
-		while len(asks) > 0:
-			lines.append(str(asks.pop()))
+		for order in reversed(list(self.asks)):
+			lines.append(str(order))
 
 		lines.append("\t"*3 + "Bids:")
-		bids = list(reversed(self.bids.copy()))
-		while len(bids) > 0:
-			lines.append("\t"*3 + str(bids.pop()))
+		for order in self.bids:
+			lines.append("\t"*3 + str(order))
 
 		lines.append("-"*20)
 		return "\n".join(lines)
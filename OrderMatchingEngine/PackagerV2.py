@@ -3,6 +3,9 @@ import sys
 import os
 from eth_utils import to_checksum_address
 from web3 import Web3
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
 import time
 import json
 
@@ -14,11 +17,26 @@ sys.path.append(parent_dir)
 from OrderMatchingEngine.Orderbook import Orderbook
 from OrderMatchingEngine.Trade import Trade
 from OrderMatchingEngine import Side
+from OrderMatchingEngine.settlement import NonceManager, GasPriceCache
 
 # Token addresses
 CASH_TOKEN_ADDRESS = "0x5615dEB798BB3E4dFa0139dFa1b3D433Cc23b72f"
 SECURITY_TOKEN_ADDRESS = "0x2e234DAe75C793f67A35089C9d99245E1C58470b"
 FEE_RECIPIENT = "0x3C44CdddB6a900fa2b585dd299e03d12FA4293BC"
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
+ZERO_POOL = Web3.to_bytes(hexstr='0x0000000000000000000000000000000000000000000000000000000000000000')
+
+# Distinct addresses kept by checksum_address before the least recently used is evicted
+ADDRESS_CACHE_SIZE = 65536
+
+@lru_cache(maxsize=ADDRESS_CACHE_SIZE)
+def checksum_address(address):
+    """
+    EIP-55 checksummed form of an address. Checksumming hashes the address
+    with keccak, so the result is cached per process and shared by every
+    packaging call.
+    """
+    return to_checksum_address(address)
 
 class SettlementReadyTrade:
     def __init__(self, makerToken, takerToken, makerAmount, takerAmount, maker, taker, sender, feeRecipient, pool, expiration, salt, makerIsBuyer, signature_type, maker_v, maker_r, maker_s, taker_v, taker_r, taker_s):
@@ -44,6 +62,8 @@ class SettlementReadyTrade:
 
 def create_settlement_ready_trades(trades, fee_recipient):
     settlement_ready_trades = []
+    sender = checksum_address(ZERO_ADDRESS)
+    fee_recipient = checksum_address(fee_recipient)
     
     for trade in trades:
         cash_amount = int(trade.price * trade.size)
@@ -53,16 +73,16 @@ def create_settlement_ready_trades(trades, fee_recipient):
         # The maker is always the one with the lower order ID
         if trade.buyer_id == trade.maker_order_id:
             maker_is_buyer = True
-            maker = trade.buyer_id
-            taker = trade.seller_id
+            maker = checksum_address(trade.buyer_id)
+            taker = checksum_address(trade.seller_id)
             maker_token = CASH_TOKEN_ADDRESS
             taker_token = SECURITY_TOKEN_ADDRESS
             maker_amount = cash_amount
             taker_amount = security_amount
         else:
             maker_is_buyer = False
-            maker = trade.seller_id
-            taker = trade.buyer_id
+            maker = checksum_address(trade.seller_id)
+            taker = checksum_address(trade.buyer_id)
             maker_token = SECURITY_TOKEN_ADDRESS
             taker_token = CASH_TOKEN_ADDRESS
             maker_amount = security_amount
@@ -75,9 +95,9 @@ def create_settlement_ready_trades(trades, fee_recipient):
             takerAmount=taker_amount,
             maker=maker,
             taker=taker,
-            sender=Web3.to_checksum_address('0x0000000000000000000000000000000000000000'),
-            feeRecipient=to_checksum_address(fee_recipient),
-            pool=Web3.to_bytes(hexstr='0x0000000000000000000000000000000000000000000000000000000000000000'),
+            sender=sender,
+            feeRecipient=fee_recipient,
+            pool=ZERO_POOL,
             expiration=int(time.time()) + 3600,
             salt=Web3.to_int(Web3.keccak(text=str(time.time()))),
             makerIsBuyer=maker_is_buyer,
@@ -128,7 +148,133 @@ def serialize_trade(trade):
 def serialize_settlement_ready_trades(settlement_ready_trades):
     return [serialize_trade(trade) for trade in settlement_ready_trades]
 
-def submit_trades_for_settlement(web3, contract_address, contract_abi, trades, account):
+def _package_chunk(args):
+    """
+    Worker side of package_trades: rebuilds a chunk of trades from their
+    fields, packages and serializes it
+    """
+    fields, fee_recipient = args
+    trades = [Trade(*trade) for trade in fields]
+    return serialize_settlement_ready_trades(create_settlement_ready_trades(trades, fee_recipient))
+
+def package_trades(trades, fee_recipient, workers=None, chunk_size=10000, pool=None):
+    """
+    Packages and serializes trades, returning the same dicts as
+    serialize_settlement_ready_trades(create_settlement_ready_trades(...)),
+    in the same order
+
+    Batches larger than chunk_size are split into chunks that are packaged
+    by a pool of worker processes, workers of them (one per core when None),
+    or by pool, a ProcessPoolExecutor the caller keeps between batches.
+    """
+    trades = list(trades)
+    if len(trades) <= chunk_size or workers == 1:
+        return serialize_settlement_ready_trades(create_settlement_ready_trades(trades, fee_recipient))
+    if pool is None:
+        with ProcessPoolExecutor(workers) as pool:
+            return package_trades(trades, fee_recipient, workers, chunk_size, pool)
+
+    # Trades travel to the workers as plain tuples, which pickle faster
+    chunks = [([tuple(getattr(trade, field) for field in Trade.__slots__) for trade in trades[i:i + chunk_size]],
+               fee_recipient)
+              for i in range(0, len(trades), chunk_size)]
+    packaged = []
+    for chunk in pool.map(_package_chunk, chunks):
+        packaged.extend(chunk)
+    return packaged
+
+class PackagedTradeWriter:
+    """
+    Streams serialized trades to a file as they are packaged, instead of
+    json.dump-ing a full list at the end
+
+    fmt='json' writes a JSON array, fmt='ndjson' one object per line. Both
+    put every trade on its own compact line, so the file can be tailed with
+    iter_packaged_trades while it is written; the array is only valid JSON
+    once the writer is closed. Writes go through a buffer of buffer_size
+    bytes, flushed every flush_every trades.
+    """
+    def __init__(self, path, fmt='json', buffer_size=1 << 16, flush_every=1000):
+        if fmt not in ('json', 'ndjson'):
+            raise ValueError(f"unknown format {fmt!r}")
+        self.fmt = fmt
+        self.flush_every = flush_every
+        self.count = 0
+        self.unflushed = 0
+        self.file = open(path, 'w', buffering=buffer_size)
+        if fmt == 'json':
+            self.file.write('[\n')
+
+    def write(self, serialized_trade):
+        line = json.dumps(serialized_trade, separators=(',', ':'))
+        if self.fmt == 'json' and self.count:
+            line = ',' + line
+        self.file.write(line + '\n')
+        self.count += 1
+        self.unflushed += 1
+        if self.unflushed >= self.flush_every:
+            self.flush()
+
+    def write_many(self, serialized_trades):
+        for serialized_trade in serialized_trades:
+            self.write(serialized_trade)
+
+    def flush(self):
+        self.file.flush()
+        self.unflushed = 0
+
+    def close(self):
+        if self.fmt == 'json':
+            self.file.write(']\n')
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def stream_settlement_ready_trades(trades, fee_recipient, path, fmt='json', chunk_size=1000):
+    """
+    Packages trades chunk_size at a time and writes each chunk to path as it
+    is done, so memory does not grow with the number of trades. Returns the
+    number of trades written.
+    """
+    trades = iter(trades)
+    with PackagedTradeWriter(path, fmt, flush_every=chunk_size) as writer:
+        while True:
+            chunk = list(islice(trades, chunk_size))
+            if not chunk:
+                break
+            writer.write_many(serialize_settlement_ready_trades(create_settlement_ready_trades(chunk, fee_recipient)))
+        return writer.count
+
+def iter_packaged_trades(path, follow=False, poll_interval=0.1):
+    """
+    Yields the serialized trades of a file written by PackagedTradeWriter,
+    in either format, without loading the whole file
+
+    With follow the file is tailed: it waits for more trades until the
+    closing bracket of a JSON array, and forever for NDJSON.
+    """
+    with open(path) as f:
+        partial = ''
+        while True:
+            line = f.readline()
+            if not line.endswith('\n'):
+                # end of what has been written so far
+                partial += line
+                if not follow:
+                    break
+                time.sleep(poll_interval)
+                continue
+            line, partial = (partial + line).strip(), ''
+            if line == ']':
+                break
+            if line and line != '[':
+                yield json.loads(line.lstrip(','))
+
+def submit_trades_for_settlement(web3, contract_address, contract_abi, trades, account, nonces=None, gas_prices=None):
     """
     Submit trades to the settlement contract
     
@@ -138,9 +284,15 @@ def submit_trades_for_settlement(web3, contract_address, contract_abi, trades, a
         contract_abi: Settlement contract ABI
         trades: List of serialized trades
         account: Account to submit transactions from
+        nonces: NonceManager of account, shared with other senders (one is created if None)
+        gas_prices: GasPriceCache to price the transactions with (one is created if None)
     """
     contract = web3.eth.contract(address=contract_address, abi=contract_abi)
     transactions = []
+    if nonces is None:
+        nonces = NonceManager(web3.eth, account.address)
+    if gas_prices is None:
+        gas_prices = GasPriceCache(web3.eth)
 
     for trade in trades:
         # Create the order object
@@ -171,18 +323,23 @@ def submit_trades_for_settlement(web3, contract_address, contract_abi, trades, a
         }
         
         # Build the transaction
-        tx = contract.functions.fillLimitOrder(
-            order,
-            signature,
-            int(trade['takerAmount']),  # takerTokenFillAmount
-            trade['taker'],             # taker
-            trade['sender']             # sender
-        ).build_transaction({
-            'from': account.address,
-            'gas': 300000,
-            'gasPrice': web3.eth.gas_price,
-            'nonce': web3.eth.get_transaction_count(account.address)
-        })
+        nonce = nonces.next()
+        try:
+            tx = contract.functions.fillLimitOrder(
+                order,
+                signature,
+                int(trade['takerAmount']),  # takerTokenFillAmount
+                trade['taker'],             # taker
+                trade['sender']             # sender
+            ).build_transaction({
+                'from': account.address,
+                'gas': 300000,
+                'gasPrice': gas_prices.get(),
+                'nonce': nonce
+            })
+        except Exception:
+            nonces.release(nonce)
+            raise
         
         transactions.append(tx)
     
@@ -209,9 +366,8 @@ if __name__ == "__main__":
     # Print the serialized trades
     print(json.dumps(serialized_trades, indent=2))
 
-    # Optionally, save the serialized trades to a file
-    with open('settlement_ready_trades.json', 'w') as f:
-        json.dump(serialized_trades, f, indent=2)
+    # Optionally, stream the serialized trades to a file
+    stream_settlement_ready_trades(trades, fee_recipient, 'settlement_ready_trades.json')
 
     # Add settlement contract interaction
     try:
@@ -234,8 +390,8 @@ if __name__ == "__main__":
         serialized_trades = serialize_settlement_ready_trades(settlement_ready_trades)
         
         # Save trades to file
-        with open('packaged_trades.json', 'w') as f:
-            json.dump(serialized_trades, f, indent=2)
+        with PackagedTradeWriter('packaged_trades.json') as writer:
+            writer.write_many(serialized_trades)
         
         # Submit trades to settlement contract
         transactions = submit_trades_for_settlement(
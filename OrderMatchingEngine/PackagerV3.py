@@ -15,6 +15,7 @@ sys.path.append(parent_dir)
 from OrderMatchingEngine.Orderbook import Orderbook
 from OrderMatchingEngine.Trade import Trade
 from OrderMatchingEngine import Side
+from OrderMatchingEngine.PackagerV2 import checksum_address
 
 class SettlementReadyTrade:
     def __init__(self, makerToken, takerToken, makerAmount, takerAmount, maker, taker, sender, feeRecipient, pool, expiration, salt, makerIsBuyer, signature_type, buyer_v, buyer_r, buyer_s, seller_v, seller_r, seller_s):
@@ -48,17 +49,17 @@ def create_settlement_ready_trades(trades, cash_token, security_token, fee_recip
         maker_is_buyer = trade.buyer_id < trade.seller_id
         
         if maker_is_buyer:
-            maker = Web3.to_checksum_address(trade.buyer_id)
-            taker = Web3.to_checksum_address(trade.seller_id)
-            maker_token = Web3.to_checksum_address(security_token)
-            taker_token = Web3.to_checksum_address(cash_token)
+            maker = checksum_address(trade.buyer_id)
+            taker = checksum_address(trade.seller_id)
+            maker_token = checksum_address(security_token)
+            taker_token = checksum_address(cash_token)
             maker_amount = security_amount
             taker_amount = cash_amount
         else:
-            maker = Web3.to_checksum_address(trade.seller_id)
-            taker = Web3.to_checksum_address(trade.buyer_id)
-            maker_token = Web3.to_checksum_address(cash_token)
-            taker_token = Web3.to_checksum_address(security_token)
+            maker = checksum_address(trade.seller_id)
+            taker = checksum_address(trade.buyer_id)
+            maker_token = checksum_address(cash_token)
+            taker_token = checksum_address(security_token)
             maker_amount = cash_amount
             taker_amount = security_amount
 
@@ -72,8 +73,8 @@ def create_settlement_ready_trades(trades, cash_token, security_token, fee_recip
             maker=maker,
             taker=taker,
             sender=taker,
-            feeRecipient=Web3.to_checksum_address(fee_recipient),
-            pool=Web3.to_checksum_address('0x0000000000000000000000000000000000000000'),
+            feeRecipient=checksum_address(fee_recipient),
+            pool=checksum_address('0x0000000000000000000000000000000000000000'),
             expiration=Web3.to_hex(int(time.time()) + 3600),
             salt=salt,
             makerIsBuyer=maker_is_buyer,
@@ -0,0 +1,130 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.Skiplist import SkipList
+from sortedcontainers import SortedDict
+from collections import OrderedDict
+from itertools import islice
+
+# Sorted maps that can hold the price levels of a BookSide
+BACKENDS = {
+	'sortedlist': SortedDict,
+	'skiplist': SkipList,
+}
+
+
+class PriceLevel(object):
+	"""
+	A price level.
+	--------------
+
+	All resting orders at one price, in time priority, with their total
+	remaining volume cached. The queue is an ordered dict keyed by the orders
+	themselves, so any order can be unlinked from it in O(1).
+	"""
+	__slots__ = ('price', 'orders', 'volume')
+
+	def __init__(self, price):
+		self.price = price
+		self.orders = OrderedDict()
+		self.volume = 0
+
+	def __len__(self):
+		return len(self.orders)
+
+	def __iter__(self):
+		return iter(self.orders)
+
+	def __repr__(self):
+		return f"PriceLevel(price={self.price}, orders={len(self.orders)}, volume={self.volume})"
+
+
+class BookSide(object):
+	"""
+	One side of an orderbook.
+	-------------------------
+
+	Levels are kept in a sorted map so the best price is always first. Bid
+	prices are stored negated, so both sides sort ascending on their key.
+
+	The map is built by backend, either a name from BACKENDS or a callable
+	returning an empty map with get, peekitem, values and item assignment.
+	"""
+	def __init__(self, side, backend='sortedlist'):
+		self.side = side
+		self.sign = -1 if side == Side.BUY else 1
+		if isinstance(backend, str):
+			backend = BACKENDS[backend]
+		self.levels = backend()
+		self.best = None
+		self.count = 0
+
+	def add(self, order):
+		"""
+		Appends a resting order to the back of its price level, and returns
+		the level
+		"""
+		key = self.sign * order.price
+		level = self.levels.get(key)
+		if level is None:
+			level = PriceLevel(order.price)
+			self.levels[key] = level
+			if self.best is None or key < self.sign * self.best.price:
+				self.best = level
+		level.orders[order] = None
+		level.volume += order.remainingToFill
+		self.count += 1
+		return level
+
+	def load(self, orders):
+		"""
+		Rebuilds an empty side from resting orders given in priority order,
+		without matching them
+		"""
+		levels = []
+		level = None
+		for order in orders:
+			if level is None or order.price != level.price:
+				level = PriceLevel(order.price)
+				levels.append((self.sign * order.price, level))
+			level.orders[order] = None
+			level.volume += order.remainingToFill
+			self.count += 1
+		self.levels.update(levels)
+		self.best = self.levels.peekitem(0)[1] if self.levels else None
+
+	def removeLevel(self, level):
+		"""
+		Drops an empty price level from the side
+		"""
+		del self.levels[self.sign * level.price]
+		if level is self.best:
+			self.best = self.levels.peekitem(0)[1] if self.levels else None
+
+	def remove(self, order):
+		"""
+		Unlinks a resting order from its price level, and returns the level
+		"""
+		level = self.levels[self.sign * order.price]
+		del level.orders[order]
+		level.volume -= order.remainingToFill
+		self.count -= 1
+		if not level.orders:
+			self.removeLevel(level)
+		return level
+
+	def depth(self, levels=None):
+		"""
+		[(price, volume, order count)] of the first levels price levels, best
+		first, or of all of them
+		"""
+		return [(level.price, level.volume, len(level.orders))
+				for level in islice(self.levels.values(), levels)]
+
+	def __len__(self):
+		return self.count
+
+	def __iter__(self):
+		for level in self.levels.values():
+			yield from level.orders
+
+	def __repr__(self):
+		return f"BookSide(side={self.side}, levels={len(self.levels)}, orders={self.count})"
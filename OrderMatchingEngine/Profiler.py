@@ -0,0 +1,95 @@
+from OrderMatchingEngine.Order import *
+from time import perf_counter_ns
+import json
+
+
+class PhaseProfiler(object):
+	"""
+	Phase profiler
+	--------------
+
+	Collects where the time of sampled matches goes, phase by phase. An
+	Orderbook with profiling enabled (see Orderbook.enableProfiling) passes
+	one limit or market order in sampleEvery through its match loop with a
+	mark callback, which records the end of each phase:
+
+	- cross: finding the best level and checking that it crosses
+	- trade: sizing the fill and appending it to the trade log
+	- fill:  updating order and level volumes
+	- pop:   unlinking a filled resting order and removing an empty level
+	- rest:  inserting the remainder of a limit order into the book
+	- feed:  publishing market data, when the book has a feed
+
+	Totals per (order type, phase) are kept for every sample and written as
+	collapsed stacks (for flamegraph.pl, speedscope, ...). The phases of the
+	first maxEvents samples are also kept as events and written as Chrome
+	trace JSON (chrome://tracing, Perfetto).
+	"""
+	def __init__(self, sampleEvery=100, maxEvents=100000, clock=perf_counter_ns):
+		self.sampleEvery = sampleEvery
+		self.countdown = 1  # the first order is sampled
+		self.maxEvents = maxEvents
+		self.clock = clock
+		self.samples = {}
+		self.totals = {}
+		self.events = []
+		self.droppedSamples = 0
+
+	def record(self, kind, order_id, start, marks):
+		"""
+		Adds one sampled match: marks are (phase, end time) pairs, each phase
+		starting where the previous one ended, the first at start
+		"""
+		self.samples[kind] = self.samples.get(kind, 0) + 1
+		totals = self.totals.get(kind)
+		if totals is None:
+			totals = self.totals[kind] = {}
+		keep = len(self.events) + len(marks) + 1 <= self.maxEvents
+		if keep:
+			self.events.append((kind, order_id, start, marks[-1][1] if marks else start))
+		else:
+			self.droppedSamples += 1
+		previous = start
+		for phase, end in marks:
+			totals[phase] = totals.get(phase, 0) + end - previous
+			if keep:
+				self.events.append((phase, order_id, previous, end))
+			previous = end
+
+	def collapsed(self):
+		"""
+		Collapsed stacks, one 'match;<order type>;<phase> <nanoseconds>' line
+		per phase
+		"""
+		return "\n".join(f"match;{kind};{phase} {total}"
+						 for kind, totals in sorted(self.totals.items())
+						 for phase, total in sorted(totals.items())) + "\n"
+
+	def chromeTrace(self):
+		"""
+		The kept samples as Chrome trace events: one complete event per match,
+		with its phases nested inside it
+		"""
+		return {
+			'traceEvents': [{'name': name, 'cat': 'match', 'ph': 'X', 'pid': 0, 'tid': 0,
+							 'ts': start / 1000, 'dur': (end - start) / 1000, 'args': {'order_id': order_id}}
+							for name, order_id, start, end in self.events],
+			'displayTimeUnit': 'ns',
+		}
+
+	def writeCollapsed(self, path):
+		with open(path, 'w') as f:
+			f.write(self.collapsed())
+
+	def writeChromeTrace(self, path):
+		with open(path, 'w') as f:
+			json.dump(self.chromeTrace(), f)
+
+	def reset(self):
+		self.samples = {}
+		self.totals = {}
+		self.events = []
+		self.droppedSamples = 0
+
+	def __repr__(self):
+		return f"PhaseProfiler(sampleEvery={self.sampleEvery}, samples={self.samples})"
@@ -1,48 +1,81 @@
 import random
 from typing import Optional, Tuple, Any
 
+_MISSING = object()
+
 class Node:
-    def __init__(self, key: float, value: Any):
+    __slots__ = ('key', 'value', 'forward', 'width')
+
+    def __init__(self, key: float, value: Any, level: int):
         self.key = key
         self.value = value
-        self.forward = []
+        self.forward = [None] * level
+        # width[i] is the number of level-0 steps to forward[i]
+        self.width = [1] * level
 
 class SkipList:
-    def __init__(self, max_level: int = 16, p: float = 0.5):
+    """
+    An indexable skip list, used as a sorted map from key to value.
+
+    The size is kept as a counter, the first node is always header.forward[0],
+    and every link carries its span width, so rank and positional lookups are
+    O(log n). Pass a seed to get the same tower heights, and so the same
+    layout, on every run.
+    """
+    def __init__(self, max_level: int = 16, p: float = 0.5, seed: Optional[int] = None):
         self.max_level = max_level
         self.p = p
-        self.header = Node(None, None)
-        self.header.forward = [None] * max_level
+        self.random = random.Random(seed)
+        self.header = Node(None, None, max_level)
         self.level = 0
+        self.size = 0
 
     def _random_level(self) -> int:
         lvl = 1
-        while random.random() < self.p and lvl < self.max_level:
+        while self.random.random() < self.p and lvl < self.max_level:
             lvl += 1
         return lvl
 
     def insert(self, key: float, value: Any) -> None:
         update = [None] * self.max_level
+        rank = [0] * self.max_level
         current = self.header
 
         for i in range(self.level - 1, -1, -1):
+            rank[i] = rank[i + 1] if i + 1 < self.level else 0
             while current.forward[i] and current.forward[i].key < key:
+                rank[i] += current.width[i]
                 current = current.forward[i]
             update[i] = current
 
+        existing = current.forward[0]
+        if existing and existing.key == key:
+            existing.value = value
+            return
+
         level = self._random_level()
 
         if level > self.level:
             for i in range(self.level, level):
+                rank[i] = 0
                 update[i] = self.header
+                self.header.forward[i] = None
+                self.header.width[i] = self.size + 1
             self.level = level
 
-        new_node = Node(key, value)
+        new_node = Node(key, value, level)
         for i in range(level):
-            new_node.forward.append(update[i].forward[i])
+            new_node.forward[i] = update[i].forward[i]
             update[i].forward[i] = new_node
+            new_node.width[i] = update[i].width[i] - (rank[0] - rank[i])
+            update[i].width[i] = rank[0] - rank[i] + 1
+
+        for i in range(level, self.level):
+            update[i].width[i] += 1
 
-    def delete(self, key: float) -> Optional[Any]:
+        self.size += 1
+
+    def delete(self, key: float, default: Any = None) -> Any:
         update = [None] * self.max_level
         current = self.header
 
@@ -55,18 +88,24 @@ class SkipList:
 
         if current and current.key == key:
             for i in range(self.level):
-                if update[i].forward[i] != current:
-                    break
-                update[i].forward[i] = current.forward[i]
+                if update[i].forward[i] is current:
+                    update[i].width[i] += current.width[i] - 1
+                    update[i].forward[i] = current.forward[i]
+                else:
+                    update[i].width[i] -= 1
 
             while self.level > 1 and self.header.forward[self.level - 1] is None:
                 self.level -= 1
 
+            self.size -= 1
             return current.value
 
-        return None
+        return default
 
     def search(self, key: float) -> Optional[Any]:
+        return self.get(key)
+
+    def get(self, key: float, default: Any = None) -> Any:
         current = self.header
 
         for i in range(self.level - 1, -1, -1):
@@ -78,39 +117,97 @@ class SkipList:
         if current and current.key == key:
             return current.value
 
-        return None
+        return default
 
     def pop(self, key: float) -> Optional[Tuple[float, Any]]:
-        value = self.delete(key)
-        if value is not None:
+        value = self.delete(key, _MISSING)
+        if value is not _MISSING:
             return (key, value)
         return None
 
-    def __iter__(self):
+    def peekitem(self, index: int = 0) -> Tuple[float, Any]:
+        """
+        Returns the (key, value) pair at the given position
+        """
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError('skip list index out of range')
+
+        if index == 0:
+            current = self.header.forward[0]
+            return current.key, current.value
+
+        current = self.header
+        position = 0
+        for i in range(self.level - 1, -1, -1):
+            while current.forward[i] and position + current.width[i] <= index + 1:
+                position += current.width[i]
+                current = current.forward[i]
+
+        return current.key, current.value
+
+    def bisect_left(self, key: float) -> int:
+        """
+        Returns the number of keys strictly less than key
+        """
+        current = self.header
+        position = 0
+        for i in range(self.level - 1, -1, -1):
+            while current.forward[i] and current.forward[i].key < key:
+                position += current.width[i]
+                current = current.forward[i]
+        return position
+
+    def index(self, key: float) -> int:
+        """
+        Returns the rank of key, raising ValueError if it is not present
+        """
+        position = self.bisect_left(key)
+        if position < self.size and self.peekitem(position)[0] == key:
+            return position
+        raise ValueError(f'{key!r} is not in skip list')
+
+    def update(self, items) -> None:
+        for key, value in items:
+            self.insert(key, value)
+
+    def keys(self):
         current = self.header.forward[0]
         while current:
-            yield current.key, current.value
+            yield current.key
             current = current.forward[0]
 
-    def __len__(self):
-        count = 0
+    def values(self):
+        current = self.header.forward[0]
+        while current:
+            yield current.value
+            current = current.forward[0]
+
+    def __iter__(self):
         current = self.header.forward[0]
         while current:
-            count += 1
+            yield current.key, current.value
             current = current.forward[0]
-        return count
+
+    def __len__(self):
+        return self.size
 
     def __getitem__(self, key: float) -> Any:
-        value = self.search(key)
-        if value is None:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
             raise KeyError(key)
         return value
 
     def __setitem__(self, key: float, value: Any) -> None:
         self.insert(key, value)
 
+    def __delitem__(self, key: float) -> None:
+        if self.delete(key, _MISSING) is _MISSING:
+            raise KeyError(key)
+
     def __contains__(self, key: float) -> bool:
-        return self.search(key) is not None
+        return self.get(key, _MISSING) is not _MISSING
 
     def __repr__(self):
         items = list(self)
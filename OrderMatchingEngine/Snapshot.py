@@ -0,0 +1,211 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.Orderbook import *
+from OrderMatchingEngine.Journal import HEADER, SIDES, encodeOrder, decodeOrder, readRecords, replay
+from zlib import crc32
+import struct
+import mmap
+import gc
+import os
+
+# A snapshot is a fixed header and then every resting order, all bids in
+# priority order and then all asks. Version 3 stores each order as one
+# fixed-layout record, so restore decodes them in bulk with iter_unpack:
+#   header  <8sHqqqqqI  magic, version, bid count, ask count,
+#                       next trade sequence number, journal offset (-1 if none),
+#                       next order sequence number, crc32 of the records
+#   record  seq q, order id q, side B, flags B, signature type B, v B,
+#           size q, remaining q, price q, trader length B, trader 42s,
+#           r 32s, s 32s
+# Books holding an order that does not fit a record (ids or prices that are
+# not 64-bit ints, traders longer than 42 characters, r or s that are not 32
+# bytes) are written as version 2 instead: the version 1 header plus the
+# next order sequence number, a <q seq per order, and then one journal record
+# (see Journal) per order. Version 1 snapshots had no seqs.
+MAGIC = b'OBSNAP\x00\x00'
+VERSION = 3
+SNAPSHOT = struct.Struct('<8sHqqqqqI')
+SNAPSHOT_V2 = struct.Struct('<8sHqqqqq')
+SNAPSHOT_V1 = struct.Struct('<8sHqqqq')
+RECORD = struct.Struct('<qqBBBBqqqB42s32s32s')
+
+FLAG_TRADER = 1
+FLAG_V = 2
+FLAG_R = 4
+FLAG_S = 8
+
+SIGNATURE_TYPES = ('EIP-712', None)
+NO_TRADER = bytes(42)
+NO_WORD = bytes(32)
+
+
+def writeSnapshot(book, path):
+	"""
+	Writes the resting orders of a book, with their remaining volume, time
+	priority and signatures, to path
+
+	If the book has a journal, the snapshot records the journal offset it is
+	consistent with, so restoreSnapshot can replay only what came after. The
+	file is written next to path and renamed over it once it is complete.
+	Returns the size of the snapshot in bytes.
+	"""
+	journalOffset = book.journal.position() if book.journal is not None else -1
+	orders = [order for side in (book.bids, book.asks) for order in side]
+	records = _packRecords(orders)
+	if records is not None:
+		out = bytearray(SNAPSHOT.pack(MAGIC, VERSION, len(book.bids), len(book.asks),
+									  book.trades.nextSeq, journalOffset, book.nextOrderSeq, crc32(records)))
+		out += records
+	else:
+		out = bytearray(SNAPSHOT_V2.pack(MAGIC, 2, len(book.bids), len(book.asks),
+										 book.trades.nextSeq, journalOffset, book.nextOrderSeq))
+		out += struct.pack(f'<{len(orders)}q', *[order.seq for order in orders])
+		for order in orders:
+			payload = encodeOrder(order)
+			out += HEADER.pack(len(payload), crc32(payload))
+			out += payload
+
+	tmpPath = path + '.tmp'
+	with open(tmpPath, 'wb') as f:
+		f.write(out)
+		f.flush()
+		os.fsync(f.fileno())
+	os.replace(tmpPath, path)
+	return len(out)
+
+
+def _packRecords(orders):
+	"""
+	Packs orders as fixed-layout records, or returns None if one does not fit
+	"""
+	out = bytearray(RECORD.size * len(orders))
+	pack_into = RECORD.pack_into
+	offset = 0
+	try:
+		for order in orders:
+			flags = 0
+			trader_id, v, r, s = order.trader_id, order.v, order.r, order.s
+			if trader_id is None:
+				trader = NO_TRADER
+			else:
+				trader = trader_id.encode('ascii')
+				if len(trader) > 42:
+					return None
+				flags |= FLAG_TRADER
+			if v is None:
+				v = 0
+			else:
+				flags |= FLAG_V
+			if r is None:
+				r = NO_WORD
+			elif len(r) != 32:
+				return None
+			else:
+				flags |= FLAG_R
+			if s is None:
+				s = NO_WORD
+			elif len(s) != 32:
+				return None
+			else:
+				flags |= FLAG_S
+			pack_into(out, offset, order.seq, order.order_id, order.side.value, flags,
+					  SIGNATURE_TYPES.index(order.signature_type), v, order.size, order.remainingToFill,
+					  order.price, len(trader), trader, r, s)
+			offset += RECORD.size
+	except (struct.error, TypeError, ValueError, AttributeError):
+		# non-int ids or prices, str signatures, unknown signature types
+		return None
+	return out
+
+
+def _unpackRecords(buffer):
+	orders = []
+	append = orders.append
+	for (seq, order_id, side, flags, signatureType, v, size, remaining, price,
+		 traderLength, trader, r, s) in RECORD.iter_unpack(buffer):
+		order = LimitOrder(order_id, SIDES[side], size, price,
+						   trader[:traderLength].decode('ascii') if flags & FLAG_TRADER else None,
+						   SIGNATURE_TYPES[signatureType],
+						   v if flags & FLAG_V else None,
+						   r if flags & FLAG_R else None,
+						   s if flags & FLAG_S else None)
+		order.remainingToFill = remaining
+		order.seq = seq
+		append(order)
+	return orders
+
+
+def _readOrders(buffer):
+	magic, version = SNAPSHOT_V1.unpack_from(buffer, 0)[:2]
+	if magic != MAGIC or version not in (1, 2, VERSION):
+		raise ValueError("not an orderbook snapshot")
+	if version == VERSION:
+		_, _, bidCount, askCount, nextTradeSeq, journalOffset, nextOrderSeq, checksum = SNAPSHOT.unpack_from(buffer, 0)
+		with memoryview(buffer) as view:
+			records = view[SNAPSHOT.size:SNAPSHOT.size + RECORD.size * (bidCount + askCount)]
+			if len(records) != RECORD.size * (bidCount + askCount) or crc32(records) != checksum:
+				records.release()
+				raise ValueError("truncated or corrupt snapshot")
+			orders = _unpackRecords(records)
+			records.release()
+		return orders[:bidCount], orders[bidCount:], nextTradeSeq, journalOffset, nextOrderSeq
+	if version == 1:
+		_, _, bidCount, askCount, nextTradeSeq, journalOffset = SNAPSHOT_V1.unpack_from(buffer, 0)
+		# priority was the order of the records
+		nextOrderSeq = bidCount + askCount
+		seqs = range(nextOrderSeq)
+		offset = SNAPSHOT_V1.size
+	else:
+		_, _, bidCount, askCount, nextTradeSeq, journalOffset, nextOrderSeq = SNAPSHOT_V2.unpack_from(buffer, 0)
+		seqs = struct.unpack_from(f'<{bidCount + askCount}q', buffer, SNAPSHOT_V2.size)
+		offset = SNAPSHOT_V2.size + 8 * (bidCount + askCount)
+
+	with memoryview(buffer) as view:
+		orders = [decodeOrder(payload) for payload, _ in readRecords(view[offset:])]
+	if len(orders) != bidCount + askCount:
+		raise ValueError(f"truncated snapshot: {len(orders)} of {bidCount + askCount} orders")
+	for order, seq in zip(orders, seqs):
+		order.seq = seq
+	return orders[:bidCount], orders[bidCount:], nextTradeSeq, journalOffset, nextOrderSeq
+
+
+def restoreSnapshot(path, journalPath=None, **kwargs):
+	"""
+	Rebuilds an Orderbook from a snapshot
+
+	The file is memory-mapped and the price levels are built in bulk from the
+	decoded orders, without matching them. With journalPath, the messages
+	journaled after the snapshot are replayed on top; a snapshot written
+	without a journal has no offset into one, and raises ValueError. Other
+	keyword arguments go to the Orderbook.
+
+	The cyclic garbage collector is paused while the orders are built: none
+	of them can be garbage yet, and its passes over a large heap cost as
+	much as the decoding.
+	"""
+	gcEnabled = gc.isenabled()
+	gc.disable()
+	try:
+		with open(path, 'rb') as f:
+			with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+				bids, asks, nextTradeSeq, journalOffset, nextOrderSeq = _readOrders(buffer)
+		if journalPath is not None and journalOffset < 0:
+			raise ValueError(f"{path} was written without a journal, so it has no offset into {journalPath}")
+
+		book = Orderbook(**kwargs)
+		book.bids.load(bids)
+		book.asks.load(asks)
+		for order in bids:
+			book.orders[order.order_id] = order
+		for order in asks:
+			book.orders[order.order_id] = order
+	finally:
+		if gcEnabled:
+			gc.enable()
+	book.trades.base = book.trades.cursor = book.trades.nextSeq = nextTradeSeq
+	book.nextOrderSeq = nextOrderSeq
+
+	if journalPath is not None:
+		journal, book.journal = book.journal, None
+		replay(journalPath, book, offset=journalOffset)
+		book.journal = journal
+	return book
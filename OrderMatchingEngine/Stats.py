@@ -0,0 +1,123 @@
+from OrderMatchingEngine.Order import *
+from array import array
+from time import perf_counter_ns
+
+
+class Histogram(object):
+	"""
+	Histogram
+	---------
+
+	HDR-style histogram of non-negative integers in fixed memory. Values
+	below 2**precision are counted exactly; above that every power of two
+	is split into 2**(precision - 1) buckets, so a value is off by at most
+	2**(1 - precision) of itself (about 3% with the default precision of 5).
+	Values at or above 2**maxBits land in the last bucket.
+	"""
+	__slots__ = ('precision', 'half', 'maxIndex', 'counts', 'count', 'total', 'min', 'max')
+
+	def __init__(self, precision=5, maxBits=40):
+		self.precision = precision
+		self.half = 1 << (precision - 1)
+		self.maxIndex = self.index((1 << maxBits) - 1)
+		self.counts = array('q', bytes(8 * (self.maxIndex + 1)))
+		self.count = 0
+		self.total = 0
+		self.min = None
+		self.max = None
+
+	def index(self, value):
+		shift = value.bit_length() - self.precision
+		if shift <= 0:
+			return value
+		return (shift + 1) * self.half + (value >> shift) - self.half
+
+	def bucketValue(self, index):
+		"""
+		Highest value counted in a bucket
+		"""
+		if index < 2 * self.half:
+			return index
+		shift = index // self.half - 1
+		return ((index % self.half + self.half + 1) << shift) - 1
+
+	def record(self, value):
+		i = self.index(value)
+		self.counts[i if i < self.maxIndex else self.maxIndex] += 1
+		self.count += 1
+		self.total += value
+		if self.min is None or value < self.min:
+			self.min = value
+		if self.max is None or value > self.max:
+			self.max = value
+
+	def percentile(self, q):
+		"""
+		Value at or below which a fraction q of the recorded values lie
+		"""
+		if not self.count:
+			return None
+		rank = max(1, int(q * self.count + 0.5))
+		seen = 0
+		for i, n in enumerate(self.counts):
+			seen += n
+			if seen >= rank:
+				return min(self.bucketValue(i), self.max)
+		return self.max
+
+	def snapshot(self):
+		return {
+			'count': self.count,
+			'min': self.min,
+			'max': self.max,
+			'mean': self.total / self.count if self.count else None,
+			'p50': self.percentile(0.5),
+			'p90': self.percentile(0.9),
+			'p99': self.percentile(0.99),
+			'p999': self.percentile(0.999),
+		}
+
+	def reset(self):
+		self.counts = array('q', bytes(8 * (self.maxIndex + 1)))
+		self.count = 0
+		self.total = 0
+		self.min = None
+		self.max = None
+
+	def __repr__(self):
+		return f"Histogram(count={self.count}, p50={self.percentile(0.5)}, max={self.max})"
+
+
+class EngineStats(object):
+	"""
+	Engine stats
+	------------
+
+	Instrumentation an Orderbook records into while enableStats() is on:
+	matching latency in nanoseconds per message type, fills, price levels
+	walked per limit or market order, and cancels that found no order.
+	"""
+	KINDS = ('limit', 'market', 'cancel')
+
+	def __init__(self, precision=5):
+		self.latency = {kind: Histogram(precision) for kind in self.KINDS}
+		self.levelsWalked = Histogram(precision)
+		self.fills = 0
+		self.cancelMisses = 0
+		self.clock = perf_counter_ns
+
+	def snapshot(self):
+		return {
+			'messages': {kind: histogram.count for kind, histogram in self.latency.items()},
+			'latencyNs': {kind: histogram.snapshot() for kind, histogram in self.latency.items()},
+			'fills': self.fills,
+			'levelsWalked': self.levelsWalked.snapshot(),
+			'cancelMisses': self.cancelMisses,
+		}
+
+	def reset(self):
+		for histogram in self.latency.values():
+			histogram.reset()
+		self.levelsWalked.reset()
+		self.fills = 0
+		self.cancelMisses = 0
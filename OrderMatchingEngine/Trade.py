@@ -7,10 +7,17 @@ class Trade(object):
 	Trade
 	-----
 
-	A trade object
+	A trade object. seq is its sequence number in the orderbook's trade log,
+	taker_side the side of the incoming order, so the maker is the seller
+	when it is Side.BUY (None when unknown).
 	"""
+	__slots__ = ('maker_order_id', 'taker_order_id', 'price', 'size', 'buyer_id', 'seller_id',
+				 'signature_type', 'v_maker', 'r_maker', 's_maker', 'v_taker', 'r_taker', 's_taker',
+				 'seq', 'taker_side')
+
 	def __init__(self, maker_order_id, taker_order_id, price, size, buyer_id, seller_id,
-				 signature_type, v_maker, r_maker, s_maker, v_taker, r_taker, s_taker):
+				 signature_type, v_maker, r_maker, s_maker, v_taker, r_taker, s_taker, seq=None,
+				 taker_side=None):
 		self.maker_order_id = maker_order_id
 		self.taker_order_id = taker_order_id
 		self.price = price
@@ -24,6 +31,8 @@ class Trade(object):
 		self.v_taker = v_taker
 		self.r_taker = r_taker
 		self.s_taker = s_taker
+		self.seq = seq
+		self.taker_side = taker_side
 
 	def __repr__(self):
 		return (f"Trade: Maker Order ID: {self.maker_order_id}, Taker Order ID: {self.taker_order_id}, "
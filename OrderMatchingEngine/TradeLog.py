@@ -0,0 +1,139 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.Trade import *
+from array import array
+
+
+class TradeLog(object):
+	"""
+	Trade log
+	---------
+
+	Columnar store of the trades an orderbook emits. Each fill appends its
+	sequence number, maker and taker order ids, price and size to typed
+	arrays, plus references to the two orders for the trader ids and
+	signatures. Trade objects are only built when a consumer reads them.
+
+	Ids, prices and sizes that do not fit a signed 64-bit int (floats,
+	strings, huge ints) turn their column into a plain list, so any value
+	the order types accept can be logged.
+
+	Consumers take trades incrementally with drain(). Drained trades are kept
+	for iteration only up to retain rows (all of them when retain is None),
+	the rest is released. Trades that were never drained are never dropped.
+	"""
+	def __init__(self, retain=None):
+		self.retain = retain
+		self.base = 0  # sequence number of the first retained row
+		self.cursor = 0  # sequence number of the next trade to drain
+		self.nextSeq = 0
+		self.seqs = array('q')
+		self.makerOrderIds = array('q')
+		self.takerOrderIds = array('q')
+		self.prices = array('q')
+		self.sizes = array('q')
+		self.makers = []
+		self.takers = []
+
+	def append(self, makerOrder, takerOrder, price, size):
+		"""
+		Records a fill and returns its sequence number
+		"""
+		seq = self.nextSeq
+		try:
+			self.makerOrderIds.append(makerOrder.order_id)
+			self.takerOrderIds.append(takerOrder.order_id)
+			self.prices.append(price)
+			self.sizes.append(size)
+		except (TypeError, OverflowError):
+			self._appendObjects(makerOrder.order_id, takerOrder.order_id, price, size)
+		self.seqs.append(seq)
+		self.makers.append(makerOrder)
+		self.takers.append(takerOrder)
+		self.nextSeq = seq + 1
+		return seq
+
+	def _appendObjects(self, makerOrderId, takerOrderId, price, size):
+		"""
+		Appends a row that a typed column rejected, turning that column into
+		a list. Rows a failed append already added are dropped first.
+		"""
+		rows = len(self.seqs)
+		for name, value in (('makerOrderIds', makerOrderId), ('takerOrderIds', takerOrderId),
+							('prices', price), ('sizes', size)):
+			column = getattr(self, name)
+			del column[rows:]
+			try:
+				column.append(value)
+			except (TypeError, OverflowError):
+				column = list(column)
+				column.append(value)
+				setattr(self, name, column)
+
+	def trade(self, seq):
+		"""
+		Builds the Trade with the given sequence number
+		"""
+		i = seq - self.base
+		if i < 0 or seq >= self.nextSeq:
+			raise IndexError(f"trade {seq} is not in the log")
+		maker = self.makers[i]
+		taker = self.takers[i]
+		if taker.side == Side.BUY:
+			buyer, seller = taker, maker
+		else:
+			buyer, seller = maker, taker
+		return Trade(self.makerOrderIds[i], self.takerOrderIds[i],
+					 self.prices[i], self.sizes[i], buyer.trader_id, seller.trader_id,
+					 taker.signature_type,
+					 buyer.v, buyer.r, buyer.s,
+					 seller.v, seller.r, seller.s, seq, taker.side)
+
+	def drain(self, limit=None):
+		"""
+		Returns the trades after the cursor, at most limit of them, and moves
+		the cursor past them
+		"""
+		end = self.nextSeq if limit is None else min(self.nextSeq, self.cursor + limit)
+		trades = [self.trade(seq) for seq in range(self.cursor, end)]
+		self.cursor = end
+		self.release()
+		return trades
+
+	def pending(self):
+		"""
+		Number of trades not drained yet
+		"""
+		return self.nextSeq - self.cursor
+
+	def release(self):
+		"""
+		Frees drained rows beyond the retained history
+		"""
+		if self.retain is None:
+			return
+		drop = self.cursor - self.base - self.retain
+		if drop <= 0:
+			return
+		for column in (self.seqs, self.makerOrderIds, self.takerOrderIds,
+					   self.prices, self.sizes, self.makers, self.takers):
+			del column[:drop]
+		self.base += drop
+
+	def __len__(self):
+		return self.nextSeq - self.base
+
+	def __iter__(self):
+		for seq in range(self.base, self.nextSeq):
+			yield self.trade(seq)
+
+	def __getitem__(self, index):
+		if isinstance(index, slice):
+			return [self.trade(self.base + i) for i in range(*index.indices(len(self)))]
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError("trade log index out of range")
+		return self.trade(self.base + index)
+
+	def __repr__(self):
+		return f"TradeLog(trades={len(self)}, pending={self.pending()}, nextSeq={self.nextSeq})"
@@ -0,0 +1,128 @@
+from OrderMatchingEngine.Order import *
+from OrderMatchingEngine.ingest_orders import iter_order_records, iter_limit_order_chunks
+import struct
+import mmap
+
+# Every message is one fixed 128 byte frame, so a buffer of messages can be
+# decoded in bulk with Struct.iter_unpack straight from a memoryview or mmap:
+#   kind B, side B, flags B, signature type B, v B, order id q, size q,
+#   price q (0 for market and cancel), trader 20s, r 32s, s 32s, padding
+MESSAGE = struct.Struct('<BBBBBqqq20s32s32s15x')
+
+KIND_LIMIT = 0
+KIND_MARKET = 1
+KIND_CANCEL = 2
+
+FLAG_TRADER = 1
+FLAG_SIGNATURE = 2
+
+SIDES = (Side.BUY, Side.SELL)
+SIGNATURE_TYPES = ('EIP-712', None)
+
+EMPTY_ADDRESS = bytes(20)
+EMPTY_WORD = bytes(32)
+
+
+def _raw(value, length):
+	"""
+	Raw bytes of a hex string ('0x' optional) or bytes value
+	"""
+	if isinstance(value, str):
+		value = bytes.fromhex(value[2:] if value.startswith('0x') else value)
+	if len(value) != length:
+		raise ValueError(f"expected {length} bytes, got {len(value)}")
+	return value
+
+
+def _fields(order):
+	cls = order.__class__
+	if cls is CancelOrder:
+		return (KIND_CANCEL, 0, 0, 0, 0, order.order_id, 0, 0, EMPTY_ADDRESS, EMPTY_WORD, EMPTY_WORD)
+	if cls is LimitOrder:
+		kind, price = KIND_LIMIT, order.price
+	elif cls is MarketOrder:
+		kind, price = KIND_MARKET, 0
+	else:
+		raise TypeError(f"cannot encode {cls.__name__}")
+
+	flags = 0
+	trader = EMPTY_ADDRESS
+	if order.trader_id is not None:
+		flags |= FLAG_TRADER
+		trader = _raw(order.trader_id, 20)
+	v, r, s = 0, EMPTY_WORD, EMPTY_WORD
+	if order.r is not None:
+		flags |= FLAG_SIGNATURE
+		v, r, s = order.v, _raw(order.r, 32), _raw(order.s, 32)
+	return (kind, order.side.value, flags, SIGNATURE_TYPES.index(order.signature_type), v,
+			order.order_id, order.remainingToFill, price, trader, r, s)
+
+
+def encode(order):
+	"""
+	Encodes a limit, market or cancel order as one message
+	"""
+	return MESSAGE.pack(*_fields(order))
+
+
+def encodeMany(orders):
+	"""
+	Encodes orders back to back into one bytearray
+	"""
+	orders = list(orders)
+	out = bytearray(MESSAGE.size * len(orders))
+	pack_into = MESSAGE.pack_into
+	for i, order in enumerate(orders):
+		pack_into(out, i * MESSAGE.size, *_fields(order))
+	return out
+
+
+def decode(buffer):
+	"""
+	Decodes every message in a bytes-like buffer (bytes, bytearray,
+	memoryview, mmap) into orders, without copying the buffer
+
+	Traders come back as lowercase '0x' hex strings, r and s as bytes.
+	Raises ValueError for a message with an unknown kind, side or signature
+	type.
+	"""
+	orders = []
+	append = orders.append
+	for kind, side, flags, signatureType, v, order_id, size, price, trader, r, s in MESSAGE.iter_unpack(buffer):
+		if kind == KIND_CANCEL:
+			append(CancelOrder(order_id))
+			continue
+		if kind > KIND_CANCEL or side > 1 or signatureType > 1:
+			raise ValueError(f"malformed message for order {order_id}")
+		trader_id = '0x' + trader.hex() if flags & FLAG_TRADER else None
+		if not flags & FLAG_SIGNATURE:
+			v = r = s = None
+		if kind == KIND_LIMIT:
+			append(LimitOrder(order_id, SIDES[side], size, price, trader_id,
+							  SIGNATURE_TYPES[signatureType], v, r, s))
+		else:
+			append(MarketOrder(order_id, SIDES[side], size, trader_id,
+							   SIGNATURE_TYPES[signatureType], v, r, s))
+	return orders
+
+
+def decodeFile(path):
+	"""
+	Memory-maps a file of messages and decodes it in bulk
+	"""
+	with open(path, 'rb') as f:
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+			return decode(buffer)
+
+
+def convertJsonFile(source, destination, chunk_size=10000):
+	"""
+	Converts a JSON array or NDJSON order file, as read by ingest_orders, to
+	a file of binary messages. Returns the number of orders written.
+	"""
+	count = 0
+	with open(destination, 'wb') as f:
+		for chunk in iter_limit_order_chunks(iter_order_records(source), chunk_size):
+			f.write(encodeMany(chunk))
+			count += len(chunk)
+	return count
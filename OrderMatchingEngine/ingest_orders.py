@@ -1,18 +1,94 @@
 import json
 import sys
 import os
+import time
 
 # Add the parent directory to the Python path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from OrderMatchingEngine.Orderbook import Orderbook
 from OrderMatchingEngine.Order import LimitOrder, Side
-from OrderMatchingEngine.PackagerV2 import create_settlement_ready_trades, serialize_settlement_ready_trades
+from OrderMatchingEngine.netting import net_trades
 
 def load_orders_from_file(filename):
     with open(filename, 'r') as f:
         return json.load(f)
 
+def iter_order_records(filename, chunk_bytes=1 << 16):
+    """
+    Yields order records one at a time from a JSON array file or an NDJSON
+    file (one JSON object per line), reading chunk_bytes at a time
+    """
+    with open(filename, 'r') as f:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == '[':
+            yield from _iter_json_array(f, chunk_bytes)
+            return
+        line = first + f.readline()
+        while line:
+            if line.strip():
+                yield json.loads(line)
+            line = f.readline()
+
+def _iter_json_array(f, chunk_bytes):
+    # The opening '[' has been read already
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    while True:
+        chunk = f.read(chunk_bytes)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] == ','):
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise
+                break  # the record continues in the next chunk
+            yield record
+        if not chunk:
+            raise ValueError(f"unterminated JSON array in {f.name}")
+
+def iter_limit_order_chunks(records, chunk_size=10000):
+    """
+    Converts order records to LimitOrders, chunk_size at a time
+    """
+    chunk = []
+    for order_data in records:
+        chunk.append(convert_to_limit_order(order_data))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def stream_orders_into_book(orderbook, filename, chunk_size=10000, report=True):
+    """
+    Feeds the orders in filename to the orderbook as they are parsed, so at
+    most one chunk of orders is held in memory
+
+    Returns the number of orders processed and the time it took.
+    """
+    count = 0
+    start = time.perf_counter()
+    for chunk in iter_limit_order_chunks(iter_order_records(filename), chunk_size):
+        orderbook.process_batch(chunk, reports=False)
+        count += len(chunk)
+    elapsed = time.perf_counter() - start
+    if report:
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        print(f"Streamed {count} orders in {elapsed:.3f}s ({rate:.0f} orders/s)")
+    return count, elapsed
+
 def convert_to_limit_order(order_data):
     side = Side.BUY if order_data['side'] == 0 else Side.SELL
     return LimitOrder(
@@ -27,36 +103,43 @@ def convert_to_limit_order(order_data):
         s=order_data['s']
     )
 
-def main():
+def main(filename='../../orderCreation/test_orders.json', stream=False, net=False):
+    # Packaging needs web3, which the streaming and conversion helpers do not
+    from OrderMatchingEngine.PackagerV2 import stream_settlement_ready_trades
+
     # Initialize the orderbook
     orderbook = Orderbook()
 
-    # Load orders from the JSON file
-    orders_data = load_orders_from_file('../../orderCreation/test_orders.json')
+    if stream:
+        # Parse and match the JSON array or NDJSON file incrementally
+        count, _ = stream_orders_into_book(orderbook, filename)
+    else:
+        # Load orders from the JSON file
+        orders_data = load_orders_from_file(filename)
 
-    # Process each order through the orderbook
-    for order_data in orders_data:
-        order = convert_to_limit_order(order_data)
-        orderbook.add_order(order)
+        # Process each order through the orderbook
+        for order_data in orders_data:
+            order = convert_to_limit_order(order_data)
+            orderbook.add_order(order)
+        count = len(orders_data)
 
     # Print summary of processed orders
-    print(f"Processed {len(orders_data)} orders")
+    print(f"Processed {count} orders")
     print(f"Resulting in {len(orderbook.trades)} trades")
 
     # Set fee recipient
     fee_recipient = "0x3C44CdddB6a900fa2b585dd299e03d12FA4293BC"
 
-    # Package the trades - only pass trades and fee_recipient
-    settlement_ready_trades = create_settlement_ready_trades(orderbook.trades, fee_recipient)
-    packaged_trades = serialize_settlement_ready_trades(settlement_ready_trades)
-
-    # Print the packaged trades
-    print("\nPackaged Trades:")
-    print(json.dumps(packaged_trades, indent=2))
+    # Optionally net fills between the same traders into fewer settlement records
+    trades = orderbook.trades
+    if net:
+        trades = net_trades(trades)
+        print(f"Netted into {len(trades)} settlement records")
 
-    # Optionally, save the packaged trades to a file
-    with open('packaged_trades.json', 'w') as f:
-        json.dump(packaged_trades, f, indent=2)
+    # Package the trades and stream them to a file as they are packaged
+    count = stream_settlement_ready_trades(trades, fee_recipient, 'packaged_trades.json')
+    print(f"Packaged {count} trades into packaged_trades.json")
 
 if __name__ == "__main__":
-    main()
+    args = [arg for arg in sys.argv[1:] if arg not in ('--stream', '--net')]
+    main(*args, stream='--stream' in sys.argv[1:], net='--net' in sys.argv[1:])
@@ -0,0 +1,63 @@
+## Nets fills between the same two traders before they are packaged for settlement
+from OrderMatchingEngine.Trade import Trade
+
+
+class NettedTrade(Trade):
+    """
+    One settlement record standing for several fills between the same buyer
+    and seller at the same price, with the same trader as maker
+
+    It is a Trade, so the packagers take it unchanged: size is the total of
+    the fills, the order ids and signatures are those of the first fill.
+    maker_order_ids, taker_order_ids and seqs list every fill it stands
+    for, in order.
+    """
+    __slots__ = ('maker_order_ids', 'taker_order_ids', 'seqs')
+
+    def __init__(self, trade):
+        super().__init__(trade.maker_order_id, trade.taker_order_id, trade.price, trade.size,
+                         trade.buyer_id, trade.seller_id, trade.signature_type,
+                         trade.v_maker, trade.r_maker, trade.s_maker,
+                         trade.v_taker, trade.r_taker, trade.s_taker, trade.seq, trade.taker_side)
+        self.maker_order_ids = [trade.maker_order_id]
+        self.taker_order_ids = [trade.taker_order_id]
+        self.seqs = [trade.seq]
+
+    def add(self, trade):
+        self.size += trade.size
+        self.maker_order_ids.append(trade.maker_order_id)
+        self.taker_order_ids.append(trade.taker_order_id)
+        self.seqs.append(trade.seq)
+
+    @property
+    def fills(self):
+        return len(self.seqs)
+
+
+def net_trades(trades, window=None):
+    """
+    Nets fills with the same buyer, seller, price, signature type and taker
+    side (so the same trader is the maker) into NettedTrades, which replace
+    them between orderbook.trades and create_settlement_ready_trades
+
+    Only fills in the same settlement window are netted: trades is cut into
+    consecutive windows of window fills (one window when None). Fills where
+    either trader or the taker side is unknown are never netted. Records
+    come out in the order of their first fill.
+    """
+    netted = []
+    groups = {}
+    for n, trade in enumerate(trades):
+        if window is not None and n % window == 0:
+            groups = {}
+        if trade.buyer_id is None or trade.seller_id is None or trade.taker_side is None:
+            netted.append(NettedTrade(trade))
+            continue
+        key = (trade.buyer_id, trade.seller_id, trade.price, trade.signature_type, trade.taker_side)
+        record = groups.get(key)
+        if record is None:
+            record = groups[key] = NettedTrade(trade)
+            netted.append(record)
+        else:
+            record.add(trade)
+    return netted
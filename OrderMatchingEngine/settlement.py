@@ -0,0 +1,217 @@
+## Helpers for building and sending settlement transactions without an RPC round trip per trade
+from collections import deque
+import threading
+import time
+
+
+class NonceManager:
+    """
+    Hands out sequential nonces for one sending address locally
+
+    The nonce is read from the node (pending transaction count) on first
+    use and after resync(); every other next() is a local increment, so
+    concurrent senders sharing the manager never reuse a nonce. Call
+    resync() when a send fails, since a nonce that never reached the node
+    leaves a gap, and release() for one that was handed out but never sent.
+    """
+    def __init__(self, eth, address):
+        self.eth = eth
+        self.address = address
+        self.nonce = None
+        self.syncs = 0
+        self.lock = threading.Lock()
+
+    def next(self):
+        with self.lock:
+            if self.nonce is None:
+                self.nonce = self.eth.get_transaction_count(self.address, 'pending')
+                self.syncs += 1
+            nonce = self.nonce
+            self.nonce += 1
+            return nonce
+
+    def release(self, nonce):
+        """
+        Hands back a nonce that was never sent. Only the latest one can be
+        reused; releasing an older one leaves a gap, so it resyncs instead.
+        """
+        with self.lock:
+            if self.nonce is not None and nonce == self.nonce - 1:
+                self.nonce = nonce
+            else:
+                self.nonce = None
+
+    def resync(self):
+        """
+        Drops the local nonce; the next next() reads it from the node again
+        """
+        with self.lock:
+            self.nonce = None
+
+
+class GasPriceCache:
+    """
+    Node gas price, read at most once every refresh_interval seconds
+    """
+    def __init__(self, eth, refresh_interval=12.0, clock=time.monotonic):
+        self.eth = eth
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.price = None
+        self.fetched = None
+        self.lock = threading.Lock()
+
+    def get(self):
+        with self.lock:
+            now = self.clock()
+            if self.price is None or now - self.fetched >= self.refresh_interval:
+                self.price = self.eth.gas_price
+                self.fetched = now
+            return self.price
+
+    def invalidate(self):
+        with self.lock:
+            self.price = None
+
+
+def get_receipt(eth, tx_hash):
+    """
+    Receipt of a transaction, or None while it is not mined. web3 raises
+    TransactionNotFound for those; it is matched by name so this module
+    does not need web3.
+    """
+    try:
+        return eth.get_transaction_receipt(tx_hash)
+    except Exception as e:
+        if type(e).__name__ == 'TransactionNotFound':
+            return None
+        raise
+
+
+class SettlementResult:
+    """
+    Outcome of one trade in a SettlementPipeline run
+
+    latency is the time from the first send to the receipt being seen;
+    error is set when the trade did not settle (send failures, a reverted
+    transaction, or max_attempts used up while stuck).
+    """
+    def __init__(self, index, trade):
+        self.index = index
+        self.trade = trade
+        self.nonce = None
+        self.gas_price = None
+        self.tx_hash = None
+        self.hashes = []  # every transaction sent for the trade; any one of them may be mined
+        self.attempts = 0
+        self.first_sent_at = None
+        self.sent_at = None
+        self.receipt = None
+        self.latency = None
+        self.error = None
+
+    def __repr__(self):
+        return (f"SettlementResult(index={self.index}, nonce={self.nonce}, tx_hash={self.tx_hash}, "
+                f"attempts={self.attempts}, latency={self.latency}, error={self.error!r})")
+
+
+class SettlementPipeline:
+    """
+    Pipelined settlement submission
+
+    Keeps up to window transactions in flight instead of waiting for each
+    receipt before sending the next trade. Every poll_interval seconds the
+    receipts of everything in flight are checked, and the freed slots are
+    refilled. A transaction still unmined stuck_after seconds after it was
+    sent is re-priced: sent again with the same nonce and a gas price
+    reprice_factor higher (or the current price, if that is higher). A
+    trade is given up after max_attempts sends.
+
+    build(trade, nonce, gas_price) returns the signed raw transaction of a
+    trade; eth is web3.eth or anything with send_raw_transaction and
+    get_transaction_receipt. run() returns a SettlementResult per trade.
+    """
+    def __init__(self, eth, nonces, gas_prices, build, window=16, poll_interval=1.0, stuck_after=60.0,
+                 reprice_factor=1.125, max_attempts=4, clock=time.monotonic, sleep=time.sleep):
+        self.eth = eth
+        self.nonces = nonces
+        self.gas_prices = gas_prices
+        self.build = build
+        self.window = window
+        self.poll_interval = poll_interval
+        self.stuck_after = stuck_after
+        self.reprice_factor = reprice_factor
+        self.max_attempts = max_attempts
+        self.clock = clock
+        self.sleep = sleep
+
+    def run(self, trades):
+        results = [SettlementResult(index, trade) for index, trade in enumerate(trades)]
+        queue = deque(results)
+        in_flight = []
+        while queue or in_flight:
+            while queue and len(in_flight) < self.window:
+                result = queue.popleft()
+                if self._send(result, self.gas_prices.get()):
+                    in_flight.append(result)
+                elif result.error is None:
+                    queue.append(result)
+            if in_flight:
+                self.sleep(self.poll_interval)
+                in_flight = [result for result in in_flight if not self._poll(result)]
+        return results
+
+    def _send(self, result, gas_price):
+        """
+        Sends a trade's transaction, the first time or as a replacement.
+        Returns whether it was accepted.
+        """
+        replacing = result.nonce is not None
+        nonce = result.nonce if replacing else self.nonces.next()
+        result.attempts += 1
+        try:
+            tx_hash = self.eth.send_raw_transaction(self.build(result.trade, nonce, gas_price))
+        except Exception as e:
+            if replacing:
+                # the original is still pending; wait another stuck_after for it
+                result.sent_at = self.clock()
+            else:
+                self.nonces.resync()
+            if result.attempts >= self.max_attempts:
+                result.error = e
+            return False
+        now = self.clock()
+        result.nonce = nonce
+        result.gas_price = gas_price
+        result.tx_hash = tx_hash
+        result.hashes.append(tx_hash)
+        result.sent_at = now
+        if result.first_sent_at is None:
+            result.first_sent_at = now
+        return True
+
+    def _poll(self, result):
+        """
+        Checks a trade in flight, re-pricing it if it is stuck. Returns
+        whether it is done.
+        """
+        for tx_hash in result.hashes:
+            receipt = get_receipt(self.eth, tx_hash)
+            if receipt is not None:
+                result.tx_hash = tx_hash
+                result.receipt = receipt
+                result.latency = self.clock() - result.first_sent_at
+                if receipt['status'] == 0:
+                    result.error = 'reverted'
+                return True
+
+        if self.clock() - result.sent_at < self.stuck_after:
+            return False
+        if result.attempts >= self.max_attempts:
+            result.error = TimeoutError(f"not mined after {result.attempts} attempts")
+            return True
+        self.gas_prices.invalidate()
+        gas_price = max(int(result.gas_price * self.reprice_factor), self.gas_prices.get())
+        if not self._send(result, gas_price) and result.error is not None:
+            return True
+        return False
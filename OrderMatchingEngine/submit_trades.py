@@ -1,7 +1,15 @@
 from web3 import Web3
 from eth_account import Account
+from functools import partial
 import json
 import os
+import sys
+
+# Add the parent directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from OrderMatchingEngine.settlement import NonceManager, GasPriceCache, SettlementPipeline
+from OrderMatchingEngine.PackagerV2 import iter_packaged_trades
 
 # Connect to your network (e.g., local Anvil)
 w3 = Web3(Web3.HTTPProvider('http://localhost:8545'))
@@ -23,7 +31,7 @@ settlement = w3.eth.contract(address=SETTLEMENT_ADDRESS, abi=settlement_abi)
 cash_token = w3.eth.contract(address=CASH_TOKEN_ADDRESS, abi=token_abi)
 security_token = w3.eth.contract(address=SECURITY_TOKEN_ADDRESS, abi=token_abi)
 
-def submit_trade(trade):
+def build_signed_transaction(trade, nonce, gas_price, sender):
     # Convert trade data to contract format
     limit_order = {
         'makerToken': trade['makerToken'],
@@ -51,36 +59,58 @@ def submit_trade(trade):
         'taker_s': trade['taker_s']
     }
 
-    # Build transaction
+    # Build and sign transaction
     tx = settlement.functions.fillLimitOrder(
         limit_order,
         signatures,
         int(trade['takerAmount'])  # takerTokenFillAmount
     ).build_transaction({
-        'from': w3.eth.accounts[0],
+        'from': sender,
         'gas': 500000,
-        'gasPrice': w3.eth.gas_price,
-        'nonce': w3.eth.get_transaction_count(w3.eth.accounts[0])
+        'gasPrice': gas_price,
+        'nonce': nonce
     })
-
-    # Sign and send transaction
     signed_tx = w3.eth.account.sign_transaction(tx, private_key='your_private_key')
-    tx_hash = w3.eth.send_raw_transaction(signed_tx.rawTransaction)
+    return signed_tx.rawTransaction
+
+def submit_trade(trade, nonces, gas_prices):
+    # Build transaction, with a locally allocated nonce and the cached gas price
+    nonce = nonces.next()
+    try:
+        raw_tx = build_signed_transaction(trade, nonce, gas_prices.get(), nonces.address)
+    except Exception:
+        nonces.release(nonce)
+        raise
+
+    # Send transaction
+    try:
+        tx_hash = w3.eth.send_raw_transaction(raw_tx)
+    except Exception:
+        # the node's view of our nonce is the only reliable one now
+        nonces.resync()
+        raise
     
     # Wait for transaction receipt
     receipt = w3.eth.wait_for_transaction_receipt(tx_hash)
     return receipt
 
-def main():
+def main(window=16):
     # Load trades from packaged_trades.json
-    with open('../Order-Book-Matching-Engine/OrderMatchingEngine/packaged_trades.json') as f:
-        trades = json.load(f)
-
-    # Submit each trade
-    for i, trade in enumerate(trades):
-        print(f"Submitting trade {i}...")
-        receipt = submit_trade(trade)
-        print(f"Trade {i} settled in tx: {receipt.transactionHash.hex()}")
+    trades = iter_packaged_trades('../Order-Book-Matching-Engine/OrderMatchingEngine/packaged_trades.json')
+
+    # One nonce sync and one gas price read for the whole run
+    nonces = NonceManager(w3.eth, w3.eth.accounts[0])
+    gas_prices = GasPriceCache(w3.eth)
+
+    # Keep up to window trades in flight instead of waiting for each receipt
+    build = partial(build_signed_transaction, sender=nonces.address)
+    pipeline = SettlementPipeline(w3.eth, nonces, gas_prices, build, window=window)
+    for result in pipeline.run(trades):
+        if result.error is not None:
+            print(f"Trade {result.index} failed after {result.attempts} attempts: {result.error}")
+        else:
+            print(f"Trade {result.index} settled in tx: {result.tx_hash.hex()} "
+                  f"after {result.latency:.1f}s ({result.attempts} attempts)")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,49 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder, MarketOrder, CancelOrder
+from OrderMatchingEngine.Skiplist import SkipList
+from random import Random
+import time
+
+# Compares the price-level backends of Orderbook on deep books, where most
+# orders open a new price level instead of joining an existing one.
+SEED = 42
+numOrders = 10**5
+depths = [10**2, 10**3, 10**4, 10**5]
+
+def create_orders(depth, seed=SEED):
+    rng = Random(seed)
+    orders = []
+    for n in range(numOrders):
+        r = rng.random()
+        if r < 0.1 and n > 0:
+            orders.append(CancelOrder(rng.randrange(n)))
+        elif r < 0.15:
+            side = Side.BUY if rng.getrandbits(1) else Side.SELL
+            orders.append(MarketOrder(n, side, rng.randint(1, 200)))
+        else:
+            # Bids and asks overlap only around the middle of the range
+            side = Side.BUY if rng.getrandbits(1) else Side.SELL
+            offset = rng.randint(0, depth)
+            price = 10**6 - offset if side == Side.BUY else 10**6 + offset - depth // 100
+            orders.append(LimitOrder(n, side, rng.randint(1, 200), price))
+    return orders
+
+backends = {
+    'sortedlist': 'sortedlist',
+    'skiplist': lambda: SkipList(seed=SEED),
+}
+
+print(f"{'depth':>8} {'backend':>12} {'levels':>8} {'orders/s':>12} {'us/order':>10}")
+for depth in depths:
+    for name, backend in backends.items():
+        orders = create_orders(depth)
+        OB = Orderbook(backend=backend)
+        start = time.perf_counter()
+        for order in orders:
+            OB.processOrder(order)
+        totalTime = time.perf_counter() - start
+        levels = len(OB.bids.levels) + len(OB.asks.levels)
+        print(f"{depth:>8} {name:>12} {levels:>8} {numOrders/totalTime:>12.0f} {1e6*totalTime/numOrders:>10.2f}")
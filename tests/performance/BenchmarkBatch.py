@@ -0,0 +1,42 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder
+from random import Random
+import time
+
+# Same workload as Benchmark.py, fed one order at a time through
+# processOrder and as one list through process_batch.
+SEED = 42
+numOrders = 10**5
+
+def create_orders(seed=SEED):
+    rng = Random(seed)
+    orders = []
+    for n in range(numOrders):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        orders.append(LimitOrder(n, side, rng.randint(1, 200), rng.randint(1, 4)))
+    return orders
+
+def run_single(OB, orders):
+    for order in orders:
+        OB.processOrder(order)
+
+def run_batch(OB, orders):
+    OB.process_batch(orders)
+
+def run_batch_no_reports(OB, orders):
+    OB.process_batch(orders, reports=False)
+
+for name, run in [('processOrder', run_single), ('process_batch', run_batch),
+                  ('process_batch(reports=False)', run_batch_no_reports)]:
+    orders = create_orders()
+    OB = Orderbook()
+    start = time.perf_counter()
+    run(OB, orders)
+    totalTime = time.perf_counter() - start
+    print(f"{name}:")
+    print("  Time per order (us): " + str(1000000*totalTime/numOrders))
+    print("  Orders per second: " + str(numOrders/totalTime))
+    print("  Trades: " + str(len(OB.trades)))
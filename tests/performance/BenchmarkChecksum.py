@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine.Trade import Trade
+from OrderMatchingEngine import PackagerV2, PackagerV3
+from random import Random
+import time
+
+# Packages 1M trades between a few thousand traders with the address cache,
+# and with every address checksummed again (the cache's wrapped function).
+# PackagerV3 checksums five addresses per trade.
+SEED = 42
+numTrades = int(sys.argv[1]) if len(sys.argv) > 1 else 10**6
+numTraders = 3000
+
+cash_token = "0x1234567890123456789012345678901234567890"
+security_token = "0xabcdefabcdefabcdefabcdefabcdefabcdefabcd"
+fee_recipient = "0xfedc000000000000000000000000000000000000"
+
+def create_trades(seed=SEED):
+    rng = Random(seed)
+    traders = ['0x' + rng.randbytes(20).hex() for _ in range(numTraders)]
+    trades = []
+    for n in range(numTrades):
+        buyer, seller = rng.sample(traders, 2)
+        r, s = rng.randbytes(32), rng.randbytes(32)
+        trades.append(Trade(2 * n, 2 * n + 1, rng.randint(1, 4), rng.randint(1, 200), buyer, seller,
+                            'EIP-712', 27, r, s, 28, s, r, n))
+    return trades
+
+trades = create_trades()
+cached = PackagerV2.checksum_address
+uncached = cached.__wrapped__
+
+for name, checksum in [('uncached', uncached), ('cached', cached)]:
+    cached.cache_clear()
+    PackagerV3.checksum_address = checksum
+    start = time.perf_counter()
+    PackagerV3.create_settlement_ready_trades(trades, cash_token, security_token, fee_recipient)
+    totalTime = time.perf_counter() - start
+    print(f"{name:>8}: {totalTime:.2f} s, {1000000*totalTime/numTrades:.2f} us/trade")
+PackagerV3.checksum_address = cached
+print(cached.cache_info())
+
+# The addresses alone, without the rest of the packaging work
+addresses = [trade.buyer_id for trade in trades]
+for name, checksum in [('uncached', uncached), ('cached', cached)]:
+    start = time.perf_counter()
+    for address in addresses:
+        checksum(address)
+    totalTime = time.perf_counter() - start
+    print(f"{name:>8} checksum: {1000000*totalTime/numTrades:.3f} us/address")
@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder
+from OrderMatchingEngine.Journal import Journal, replay
+from random import Random
+import tempfile
+import secrets
+import time
+
+# Journaled matching with group commit against an fsync per order, and the
+# replay rate of the resulting journal.
+SEED = 42
+numOrders = 10**5
+
+def create_orders(seed=SEED):
+    rng = Random(seed)
+    orders = []
+    for n in range(numOrders):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        orders.append(LimitOrder(n, side, rng.randint(1, 200), rng.randint(1, 4),
+                                 trader_id='0x' + secrets.token_hex(20), v=27,
+                                 r=secrets.token_bytes(32), s=secrets.token_bytes(32)))
+    return orders
+
+directory = tempfile.mkdtemp()
+for name, groupSize, count in [('fsync per order', 1, numOrders // 100),
+                               ('group commit (512)', 512, numOrders)]:
+    path = os.path.join(directory, f'{groupSize}.journal')
+    orders = create_orders()[:count]
+    journal = Journal(path, groupSize=groupSize, groupInterval=1.0)
+    OB = Orderbook(journal=journal)
+    start = time.perf_counter()
+    for order in orders:
+        OB.processOrder(order)
+    journal.close()
+    totalTime = time.perf_counter() - start
+    print(f"{name}: {count/totalTime:.0f} orders/s, {journal.commits} fsyncs")
+
+path = os.path.join(directory, '512.journal')
+start = time.perf_counter()
+book = replay(path)
+totalTime = time.perf_counter() - start
+print(f"replay: {numOrders/totalTime:.0f} orders/s, {os.path.getsize(path)/numOrders:.1f} bytes/order, "
+      f"{len(book)} resting, {len(book.trades)} trades")
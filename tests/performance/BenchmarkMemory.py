@@ -0,0 +1,77 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Order, Orderbook, Side, LimitOrder, Trade
+from random import Random
+import tracemalloc
+import secrets
+
+# Reports the memory held per resting order and per trade. The "dict"
+# rows copy the same fields onto plain objects with a __dict__, which is
+# what every instance carried before Order and Trade were slotted.
+SEED = 42
+numObjects = 10**5
+
+class DictObject(object):
+    def __init__(self, obj, fields):
+        for name in fields:
+            setattr(self, name, getattr(obj, name))
+
+def create_orders(rng):
+    orders = []
+    for n in range(numObjects):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        order = LimitOrder(n, side, rng.randint(1, 200), rng.randint(1, 1000),
+                           trader_id='0x' + secrets.token_hex(20), v=27,
+                           r=secrets.token_bytes(32), s=secrets.token_bytes(32))
+        orders.append(order)
+    return orders
+
+def create_trades(rng):
+    v, r, s = 27, secrets.token_bytes(32), secrets.token_bytes(32)
+    return [Trade(n, n + 1, rng.randint(1, 1000), rng.randint(1, 200), 'buyer', 'seller',
+                  'EIP-712', v, r, s, v, r, s) for n in range(numObjects)]
+
+def measure_instances(objects, fields):
+    # Only the instances themselves, the field values are shared by both rows
+    copies = [None] * numObjects
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i, obj in enumerate(objects):
+        copies[i] = DictObject(obj, fields)
+    dictSize = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    slotSize = sum(sys.getsizeof(obj) for obj in objects)
+    return dictSize / numObjects, slotSize / numObjects
+
+def measure(build):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / numObjects, result
+
+def resting_book():
+    # Only bids, so nothing matches and every order rests
+    OB = Orderbook()
+    for order in create_orders(Random(SEED)):
+        order.side = Side.BUY
+        OB.processOrder(order)
+    return OB
+
+print(f"{'object':>28} {'bytes/object':>14}")
+for label, objects, fields in [
+    ('LimitOrder', create_orders(Random(SEED)), Order.__slots__),
+    ('Trade', create_trades(Random(SEED)), Trade.__slots__),
+]:
+    dictSize, slotSize = measure_instances(objects, fields)
+    print(f"{label + ' (dict)':>28} {dictSize:>14.1f}")
+    print(f"{label + ' (slots)':>28} {slotSize:>14.1f}")
+
+# Everything a resting order costs, including its fields and book overhead
+perObject, _ = measure(lambda: create_orders(Random(SEED)))
+print(f"{'LimitOrder with fields':>28} {perObject:>14.1f}")
+perObject, _ = measure(resting_book)
+print(f"{'resting order in Orderbook':>28} {perObject:>14.1f}")
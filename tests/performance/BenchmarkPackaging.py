@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine.Trade import Trade
+from OrderMatchingEngine.PackagerV2 import create_settlement_ready_trades, serialize_settlement_ready_trades, package_trades
+from concurrent.futures import ProcessPoolExecutor
+from random import Random
+import time
+
+# Serial packaging against package_trades with 1, 2, 4 ... worker processes,
+# up to the number of cores. The pool is started before timing, as a
+# settlement service would keep it between batches.
+SEED = 42
+numTrades = int(sys.argv[1]) if len(sys.argv) > 1 else 2 * 10**5
+fee_recipient = "0x3C44CdddB6a900fa2b585dd299e03d12FA4293BC"
+
+def create_trades(seed=SEED, numTraders=3000):
+    rng = Random(seed)
+    traders = ['0x' + rng.randbytes(20).hex() for _ in range(numTraders)]
+    trades = []
+    for n in range(numTrades):
+        buyer, seller = rng.sample(traders, 2)
+        r, s = rng.randbytes(32), rng.randbytes(32)
+        trades.append(Trade(2 * n, 2 * n + 1, rng.randint(1, 4), rng.randint(1, 200), buyer, seller,
+                            'EIP-712', 27, r, s, 28, s, r, n))
+    return trades
+
+if __name__ == "__main__":
+    trades = create_trades()
+
+    start = time.perf_counter()
+    serialize_settlement_ready_trades(create_settlement_ready_trades(trades, fee_recipient))
+    serialTime = time.perf_counter() - start
+    print(f"  serial: {serialTime:.2f} s, {numTrades/serialTime:>9.0f} trades/s")
+
+    workers = 1
+    while workers <= os.cpu_count():
+        with ProcessPoolExecutor(workers) as pool:
+            package_trades(trades[:workers], fee_recipient, chunk_size=1, pool=pool)  # start the workers
+            start = time.perf_counter()
+            package_trades(trades, fee_recipient, chunk_size=10000, pool=pool)
+            totalTime = time.perf_counter() - start
+        print(f"{workers:>2} workers: {totalTime:.2f} s, {numTrades/totalTime:>9.0f} trades/s, "
+              f"{serialTime/totalTime:.2f}x")
+        workers *= 2
@@ -0,0 +1,82 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder, MarketOrder
+from OrderMatchingEngine.Profiler import PhaseProfiler
+from random import Random
+import textwrap
+import inspect
+import time
+import ast
+import gc
+
+# Cost of the profiling hooks: a book whose _match has the mark calls
+# stripped out (no hooks at all), one that never had profiling, one where it
+# was enabled and disabled again (the no-op mode), and sampling every
+# 1000th, 100th and every match. Best of several runs of the same seeded
+# orders, alternating the variants so drift hits all of them alike.
+SEED = 42
+numOrders = 2 * 10**5
+runs = 7
+
+def create_orders(seed=SEED):
+    rng = Random(seed)
+    orders = []
+    for n in range(numOrders):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        if rng.random() < 0.1:
+            orders.append(MarketOrder(n, side, rng.randint(1, 500)))
+        else:
+            orders.append(LimitOrder(n, side, rng.randint(1, 200), rng.randint(90, 110)))
+    return orders
+
+class StripMarks(ast.NodeTransformer):
+    def visit_If(self, node):
+        test = node.test
+        if (isinstance(test, ast.Compare) and isinstance(test.left, ast.Name) and test.left.id == 'mark'
+                and isinstance(test.ops[0], ast.IsNot)):
+            return None
+        return self.generic_visit(node)
+
+def unhookedMatch():
+    # Orderbook._match recompiled without its `if mark is not None:` statements
+    tree = StripMarks().visit(ast.parse(textwrap.dedent(inspect.getsource(Orderbook._match))))
+    namespace = {}
+    exec(compile(ast.fix_missing_locations(tree), '<unhooked _match>', 'exec'),
+         sys.modules[Orderbook.__module__].__dict__, namespace)
+    return namespace['_match']
+
+_unhooked = unhookedMatch()
+
+def unhooked(OB):
+    OB._match = _unhooked.__get__(OB)
+
+def never(OB):
+    pass
+
+def disabled(OB):
+    OB.enableProfiling()
+    OB.disableProfiling()
+
+def sampled(every):
+    def setup(OB):
+        OB.enableProfiling(PhaseProfiler(sampleEvery=every, maxEvents=0))
+    return setup
+
+variants = [('no hooks', unhooked), ('never enabled', never), ('disabled (no-op)', disabled), ('every 1000', sampled(1000)),
+            ('every 100', sampled(100)), ('every match', sampled(1))]
+best = {name: float('inf') for name, _ in variants}
+for _ in range(runs):
+    for name, setup in variants:
+        orders = create_orders()
+        OB = Orderbook(retainTrades=0)
+        setup(OB)
+        gc.collect()
+        start = time.perf_counter()
+        OB.process_batch(orders, reports=False)
+        best[name] = min(best[name], time.perf_counter() - start)
+
+base = best['no hooks']
+for name, _ in variants:
+    print(f"{name:>18}: {1000000*best[name]/numOrders:.3f} us/order, {100*(best[name]/base - 1):+.1f}%")
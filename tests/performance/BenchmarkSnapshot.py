@@ -0,0 +1,53 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder
+from OrderMatchingEngine.Snapshot import writeSnapshot, restoreSnapshot
+from OrderMatchingEngine.Journal import Journal, replay
+from random import Random
+import tempfile
+import time
+
+# Snapshot and restore time and size against book depth, next to rebuilding
+# the same book by replaying a journal of its orders through the matcher.
+SEED = 42
+depths = [10**3, 10**4, 10**5, 10**6]
+
+def create_orders(depth, seed=SEED):
+    # Bids below 1000 and asks above it, so every order rests
+    rng = Random(seed)
+    orders = []
+    for n in range(depth):
+        if rng.getrandbits(1):
+            orders.append(LimitOrder(n, Side.BUY, rng.randint(1, 200), rng.randint(1, 999),
+                                     trader_id='0x%040x' % n, v=27, r=rng.randbytes(32), s=rng.randbytes(32)))
+        else:
+            orders.append(LimitOrder(n, Side.SELL, rng.randint(1, 200), rng.randint(1001, 2000),
+                                     trader_id='0x%040x' % n, v=28, r=rng.randbytes(32), s=rng.randbytes(32)))
+    return orders
+
+directory = tempfile.mkdtemp()
+print(f"{'depth':>8} {'size (MB)':>10} {'write (s)':>10} {'restore (s)':>12} {'replay (s)':>11}")
+for depth in depths:
+    path = os.path.join(directory, f'{depth}.snapshot')
+    journalPath = os.path.join(directory, f'{depth}.journal')
+    with Journal(journalPath, fsync=False) as journal:
+        OB = Orderbook(journal=journal)
+        OB.process_batch(create_orders(depth), reports=False)
+        OB.journal = None
+
+    start = time.perf_counter()
+    replayed = replay(journalPath)
+    replayTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    size = writeSnapshot(OB, path)
+    writeTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    restored = restoreSnapshot(path)
+    restoreTime = time.perf_counter() - start
+    assert len(restored) == len(replayed) == len(OB)
+
+    print(f"{depth:>8} {size/2**20:>10.2f} {writeTime:>10.3f} {restoreTime:>12.3f} {replayTime:>11.3f}")
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Side, LimitOrder, sortKey
+from OrderMatchingEngine.PriceLevel import BookSide
+from sortedcontainers import SortedList
+from random import Random
+import gc
+import time
+
+# Insert and pop throughput of one book side holding numResting orders,
+# ordered three ways:
+#   __lt__      SortedList of orders compared by the old Python-level
+#               LimitOrder.__lt__ (price by side, then seq)
+#   sortKey     SortedList keyed by the int sortKey, as OGOrderbook is
+#   BookSide    the price-level map of Orderbook, FIFO within a level
+SEED = 42
+numResting = 10**6
+numOps = 10**5
+prices = 10**4
+
+class LegacyOrder(LimitOrder):
+    __slots__ = ()
+
+    def __lt__(self, other):
+        if self.price != other.price:
+            if self.side == Side.BUY:
+                return self.price > other.price
+            else:
+                return self.price < other.price
+        return self.seq < other.seq
+
+def create_orders(count, start, seed):
+    rng = Random(seed)
+    orders = []
+    for n in range(start, start + count):
+        order = LegacyOrder(n, Side.BUY, rng.randint(1, 200), rng.randint(1, prices))
+        order.seq = n
+        orders.append(order)
+    return orders
+
+def sortedlist(key=None):
+    book = SortedList(key=key)
+    return book.add, lambda: book.pop(0), book.update
+
+def bookside():
+    book = BookSide(Side.BUY)
+    def pop():
+        level = book.best
+        order = level.orders.popitem(last=False)[0]
+        level.volume -= order.remainingToFill
+        book.count -= 1
+        if not level.orders:
+            book.removeLevel(level)
+        return order
+    return book.add, pop, None
+
+books = {
+    '__lt__': sortedlist,
+    'sortKey': lambda: sortedlist(lambda order: sortKey(order.side, order.price, order.seq)),
+    'BookSide': bookside,
+}
+
+resting = create_orders(numResting, 0, SEED)
+incoming = create_orders(numOps, numResting, SEED + 1)
+
+print(f"{numResting} resting orders over {prices} prices, {numOps} operations each")
+print(f"{'book':>10} {'fill s':>8} {'inserts/s':>12} {'pops/s':>12}")
+for name, create in books.items():
+    gc.collect()
+    add, pop, update = create()
+    start = time.perf_counter()
+    if update is not None:
+        update(resting)
+    else:
+        for order in resting:
+            add(order)
+    fillTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for order in incoming:
+        add(order)
+    insertTime = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(numOps):
+        pop()
+    popTime = time.perf_counter() - start
+    print(f"{name:>10} {fillTime:>8.2f} {numOps/insertTime:>12.0f} {numOps/popTime:>12.0f}")
+
+# Output (1 core, Python 3.11):
+#       book   fill s    inserts/s       pops/s
+#     __lt__     1.94       213303      3711441
+#    sortKey     0.78       653791      2584987
+#   BookSide     0.59      1517752      3151284
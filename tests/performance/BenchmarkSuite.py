@@ -0,0 +1,236 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder, MarketOrder, CancelOrder, Trade
+from random import Random
+import argparse
+import json
+import platform
+import time
+import tracemalloc
+
+# Named, seeded workloads run through a fresh Orderbook each. Every scenario
+# runs on identical orders: untimed per order for throughput (best of
+# --repeat runs), timed per order for the latency percentiles, and under
+# tracemalloc for the peak memory. Results can be saved as JSON and
+# compared with a saved baseline, e.g.
+#
+#   python BenchmarkSuite.py --output baseline.json
+#   python BenchmarkSuite.py --baseline baseline.json
+SEED = 42
+
+def deep_book(rng, n):
+    """
+    Builds a deep book: bids and asks over 1000 prices each, never crossing
+    """
+    orders = []
+    for i in range(n):
+        if rng.getrandbits(1):
+            orders.append(LimitOrder(i, Side.BUY, rng.randint(1, 200), rng.randint(9000, 9999)))
+        else:
+            orders.append(LimitOrder(i, Side.SELL, rng.randint(1, 200), rng.randint(10001, 11000)))
+    return [], orders
+
+def cancel_heavy(rng, n):
+    """
+    Crossing limit orders where six in ten messages cancel a live order
+    """
+    orders = []
+    live = []
+    for i in range(n):
+        if live and rng.random() < 0.6:
+            orders.append(CancelOrder(live.pop(rng.randrange(len(live)))))
+            continue
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        orders.append(LimitOrder(i, side, rng.randint(1, 200), rng.randint(95, 105)))
+        live.append(i)
+    return [], orders
+
+def market_sweeps(rng, n):
+    """
+    Market orders against a pre-built book, each sweeping several levels
+    """
+    setup = []
+    for i in range(n):
+        setup.append(LimitOrder(i, Side.BUY, rng.randint(1, 100), rng.randint(1, 999)))
+        setup.append(LimitOrder(n + i, Side.SELL, rng.randint(1, 100), rng.randint(1001, 2000)))
+    orders = [MarketOrder(2 * n + i, Side.BUY if rng.getrandbits(1) else Side.SELL, rng.randint(100, 1000))
+              for i in range(n // 10)]
+    return setup, orders
+
+def wide_prices(rng, n):
+    """
+    Crossing limit orders over 10000 prices
+    """
+    return [], [LimitOrder(i, Side.BUY if rng.getrandbits(1) else Side.SELL, rng.randint(1, 200),
+                           rng.randint(1, 10000))
+                for i in range(n)]
+
+def narrow_prices(rng, n):
+    """
+    The workload of Benchmark.py: crossing limit orders over 4 prices
+    """
+    return [], [LimitOrder(i, Side.BUY if rng.getrandbits(1) else Side.SELL, rng.randint(1, 200),
+                           rng.randint(1, 4))
+                for i in range(n)]
+
+SCENARIOS = {
+    'deep_book': deep_book,
+    'cancel_heavy': cancel_heavy,
+    'market_sweeps': market_sweeps,
+    'wide_prices': wide_prices,
+    'narrow_prices': narrow_prices,
+}
+
+def percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+def summarize(count, totalTime, latencies, peak):
+    latencies.sort()
+    return {
+        'messages': count,
+        'throughput': count / totalTime,
+        'p50_us': percentile(latencies, 0.5) / 1000,
+        'p99_us': percentile(latencies, 0.99) / 1000,
+        'p999_us': percentile(latencies, 0.999) / 1000,
+        'peak_mib': peak / 2**20,
+    }
+
+def run_scenario(create, n, seed, repeat=3):
+    def fresh():
+        setup, orders = create(Random(seed), n)
+        OB = Orderbook(retainTrades=0)
+        OB.process_batch(setup, reports=False)
+        OB.trades.drain()
+        return OB, orders
+
+    totalTime = float('inf')
+    for _ in range(repeat):
+        OB, orders = fresh()
+        processOrder = OB.processOrder
+        start = time.perf_counter()
+        for order in orders:
+            processOrder(order)
+        totalTime = min(totalTime, time.perf_counter() - start)
+
+    OB, orders = fresh()
+    processOrder = OB.processOrder
+    clock = time.perf_counter_ns
+    latencies = []
+    append = latencies.append
+    for order in orders:
+        t = clock()
+        processOrder(order)
+        append(clock() - t)
+
+    # trace only the matching, not building the book and its orders
+    OB, orders = fresh()
+    tracemalloc.start()
+    for order in orders:
+        OB.processOrder(order)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(len(orders), totalTime, latencies, peak)
+
+def run_packaging(n, seed):
+    """
+    PackagerV2 throughput, per trade, on seeded trades between 3000 traders
+    """
+    from OrderMatchingEngine.PackagerV2 import create_settlement_ready_trades, serialize_settlement_ready_trades
+    rng = Random(seed)
+    traders = ['0x' + rng.randbytes(20).hex() for _ in range(3000)]
+    trades = []
+    for i in range(n):
+        buyer, seller = rng.sample(traders, 2)
+        r, s = rng.randbytes(32), rng.randbytes(32)
+        trades.append(Trade(2 * i, 2 * i + 1, rng.randint(1, 4), rng.randint(1, 200), buyer, seller,
+                            'EIP-712', 27, r, s, 28, s, r, i))
+    fee_recipient = "0x3C44CdddB6a900fa2b585dd299e03d12FA4293BC"
+
+    def package(batch):
+        return serialize_settlement_ready_trades(create_settlement_ready_trades(batch, fee_recipient))
+
+    start = time.perf_counter()
+    package(trades)
+    totalTime = time.perf_counter() - start
+
+    clock = time.perf_counter_ns
+    latencies = []
+    for trade in trades:
+        t = clock()
+        package([trade])
+        latencies.append(clock() - t)
+
+    tracemalloc.start()
+    package(trades)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return summarize(n, totalTime, latencies, peak)
+
+def compare(results, baseline, tolerance):
+    """
+    Prints each metric against the baseline and returns the regressions
+    beyond tolerance (a fraction)
+    """
+    regressions = []
+    for name, metrics in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric, value in metrics.items():
+            if metric == 'messages' or metric not in base or not base[metric]:
+                continue
+            ratio = value / base[metric]
+            # throughput regresses downwards, latency and memory upwards
+            worse = ratio < 1 - tolerance if metric == 'throughput' else ratio > 1 + tolerance
+            print(f"  {name:>14} {metric:>10}: {base[metric]:>12.2f} -> {value:>12.2f} ({ratio:.2f}x)"
+                  + ("  REGRESSION" if worse else ""))
+            if worse:
+                regressions.append((name, metric, ratio))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seeded orderbook and packaging benchmarks")
+    parser.add_argument('scenarios', nargs='*', default=list(SCENARIOS) + ['packaging'],
+                        help="scenarios to run (default: all)")
+    parser.add_argument('--size', type=int, default=10**5, help="messages per scenario")
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--repeat', type=int, default=3, help="throughput runs per scenario, the best is kept")
+    parser.add_argument('--output', help="write the results to this JSON file")
+    parser.add_argument('--baseline', help="compare with the results in this JSON file")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="relative change counted as a regression (default 0.1)")
+    args = parser.parse_args(argv)
+
+    results = {}
+    for name in args.scenarios:
+        if name == 'packaging':
+            try:
+                metrics = run_packaging(args.size // 10, args.seed)
+            except ImportError as e:
+                print(f"{name:>14}: skipped ({e})")
+                continue
+        else:
+            metrics = run_scenario(SCENARIOS[name], args.size, args.seed, args.repeat)
+        results[name] = metrics
+        print(f"{name:>14}: {metrics['throughput']:>9.0f} msg/s  p50 {metrics['p50_us']:.2f} us  "
+              f"p99 {metrics['p99_us']:.2f} us  p99.9 {metrics['p999_us']:.2f} us  "
+              f"peak {metrics['peak_mib']:.1f} MiB")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'seed': args.seed, 'size': args.size, 'python': platform.python_version(),
+                       'results': results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if (baseline['seed'], baseline['size']) != (args.seed, args.size):
+            print("warning: baseline was run with a different seed or size")
+        print("Against baseline:")
+        if compare(results, baseline['results'], args.tolerance):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
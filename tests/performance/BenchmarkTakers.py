@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Orderbook, Side, LimitOrder, MarketOrder
+from random import Random
+import time
+
+# Taker-heavy workload: a few large resting orders on each side, hit by many
+# small market and marketable limit orders, so nearly every fill is a
+# partial fill of the resting order at the head of its level.
+SEED = 42
+numMakers = 100
+numTakers = 10**5
+
+def create_orders(seed=SEED):
+    rng = Random(seed)
+    makers = []
+    for n in range(numMakers):
+        makers.append(LimitOrder(n, Side.SELL, 10**6, 101 + n % 5))
+        makers.append(LimitOrder(numMakers + n, Side.BUY, 10**6, 99 - n % 5))
+    takers = []
+    for n in range(2*numMakers, 2*numMakers + numTakers):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        if rng.random() < 0.5:
+            takers.append(MarketOrder(n, side, rng.randint(1, 10)))
+        else:
+            price = 105 if side == Side.BUY else 95
+            takers.append(LimitOrder(n, side, rng.randint(1, 10), price))
+    return makers, takers
+
+makers, takers = create_orders()
+OB = Orderbook()
+OB.process_batch(makers, reports=False)
+
+start = time.perf_counter()
+for order in takers:
+    OB.processOrder(order)
+totalTime = time.perf_counter() - start
+
+print("Resting orders: " + str(len(OB)))
+print("Trades: " + str(len(OB.trades)))
+print("Time per taker order (us): " + str(1000000*totalTime/numTakers))
+print("Taker orders per second: " + str(numTakers/totalTime))
@@ -5,15 +5,18 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(
 from OrderMatchingEngine import Order, Orderbook, Side, LimitOrder
 from OrderMatchingEngine.PackagerV2 import create_settlement_ready_trades
 
-from random import getrandbits, randint
+from random import Random
 import time
-import secrets
+
+# Seeded, so every run sees the same orders and signatures
+SEED = 42
+rng = Random(SEED)
 
 def create_random_signature():
     signature_type = 'EIP-712'
-    v = randint(27, 28)  # v is typically 27 or 28 for Ethereum signatures
-    r = secrets.token_bytes(32)  # 32 bytes for r
-    s = secrets.token_bytes(32)  # 32 bytes for s
+    v = rng.randint(27, 28)  # v is typically 27 or 28 for Ethereum signatures
+    r = rng.randbytes(32)  # 32 bytes for r
+    s = rng.randbytes(32)  # 32 bytes for s
     return signature_type, v, r, s
 
 # Benchmark
@@ -21,19 +24,19 @@ OB = Orderbook()
 numOrders = 10**4
 orders = []
 for n in range(numOrders):
-	side = Side.BUY if bool(getrandbits(1)) else Side.SELL
-	size = randint(1, 200)
-	price = randint(1, 4)
+	side = Side.BUY if bool(rng.getrandbits(1)) else Side.SELL
+	size = rng.randint(1, 200)
+	price = rng.randint(1, 4)
 	signature_type, v, r, s = create_random_signature()
 	
 	order = LimitOrder(n, side, size, price)
 	order.set_signature(signature_type, v, r, s)
 	orders.append(order)
 
-start = time.time()
+start = time.perf_counter()
 for order in orders:
 	OB.processOrder(order)
-end = time.time()
+end = time.perf_counter()
 totalTime = (end-start)
 
 print("\nPerformance metrics:")
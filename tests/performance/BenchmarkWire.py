@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine.ingest_orders import load_orders_from_file, convert_to_limit_order, iter_order_records
+from OrderMatchingEngine.Wire import convertJsonFile, decodeFile
+from random import Random
+import tempfile
+import json
+import time
+
+# Parse throughput of the JSON order file paths against the binary wire
+# format, for the same orders.
+SEED = 42
+numOrders = 10**5
+
+def create_records(seed=SEED):
+    rng = Random(seed)
+    return [{'orderId': n, 'side': rng.getrandbits(1), 'size': rng.randint(1, 200),
+             'price': rng.randint(1, 4), 'trader': '0x' + rng.randbytes(20).hex(),
+             'signatureType': 'EIP-712', 'v': rng.randint(27, 28),
+             'r': '0x' + rng.randbytes(32).hex(), 's': '0x' + rng.randbytes(32).hex()}
+            for n in range(numOrders)]
+
+directory = tempfile.mkdtemp()
+jsonPath = os.path.join(directory, 'orders.json')
+ndjsonPath = os.path.join(directory, 'orders.ndjson')
+binaryPath = os.path.join(directory, 'orders.bin')
+records = create_records()
+with open(jsonPath, 'w') as f:
+    json.dump(records, f)
+with open(ndjsonPath, 'w') as f:
+    for record in records:
+        f.write(json.dumps(record) + '\n')
+convertJsonFile(jsonPath, binaryPath)
+
+for name, path, parse in [
+    ('json.load + convert', jsonPath, lambda path: [convert_to_limit_order(r) for r in load_orders_from_file(path)]),
+    ('NDJSON stream + convert', ndjsonPath, lambda path: [convert_to_limit_order(r) for r in iter_order_records(path)]),
+    ('binary (mmap)', binaryPath, decodeFile),
+]:
+    start = time.perf_counter()
+    orders = parse(path)
+    totalTime = time.perf_counter() - start
+    assert len(orders) == numOrders
+    print(f"{name:>24}: {numOrders/totalTime:>10.0f} orders/s, {os.path.getsize(path)/numOrders:.0f} bytes/order")
@@ -0,0 +1,91 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Side, LimitOrder, CancelOrder
+from OrderMatchingEngine.Gateway import Gateway, REPORT, REPORT_ACK, REPORT_FILL
+from OrderMatchingEngine.Wire import encode
+from random import Random
+import argparse
+import asyncio
+import time
+
+# Load generator for the order gateway: sends orders from several client
+# connections at a fixed total rate and measures the time from sending an
+# order to receiving its first execution report.
+SEED = 42
+
+def percentile(sortedValues, p):
+    if not sortedValues:
+        return float('nan')
+    return sortedValues[min(len(sortedValues) - 1, int(p / 100 * len(sortedValues)))]
+
+async def run_client(host, port, clientId, rate, seconds, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    rng = Random(SEED + clientId)
+    sent = {}  # (is cancel, order id) -> send time
+    limitIds = []
+    total = int(rate * seconds)
+
+    async def receive():
+        received = 0
+        while received < total:
+            kind, order_id, *_ = REPORT.unpack(await reader.readexactly(REPORT.size))
+            if kind == REPORT_FILL:
+                continue
+            latencies.append(time.perf_counter() - sent.pop((kind != REPORT_ACK, order_id)))
+            received += 1
+
+    receiver = asyncio.ensure_future(receive())
+    start = time.perf_counter()
+    for n in range(total):
+        # Keep to the schedule, sending whatever is due in one write
+        due = start + n / rate
+        delay = due - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if limitIds and rng.random() < 0.2:
+            # Cancel one of our earlier orders, resting or not
+            i = rng.randrange(len(limitIds))
+            limitIds[i], limitIds[-1] = limitIds[-1], limitIds[i]
+            order = CancelOrder(limitIds.pop())
+            key = (True, order.order_id)
+        else:
+            side = Side.BUY if rng.getrandbits(1) else Side.SELL
+            order = LimitOrder(clientId * 10**9 + n, side, rng.randint(1, 200), rng.randint(95, 105))
+            limitIds.append(order.order_id)
+            key = (False, order.order_id)
+        sent[key] = time.perf_counter()
+        writer.write(encode(order))
+    await receiver
+    writer.close()
+
+async def main(args):
+    gateway = None
+    host, port = args.host, args.port
+    if port is None:
+        gateway = await Gateway().start()
+        host, port = gateway.host, gateway.port
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*[run_client(host, port, clientId, args.rate / args.clients, args.seconds, latencies)
+                           for clientId in range(args.clients)])
+    totalTime = time.perf_counter() - start
+    if gateway is not None:
+        await gateway.close()
+
+    latencies.sort()
+    print(f"Messages: {len(latencies)} in {totalTime:.2f}s ({len(latencies)/totalTime:.0f} msg/s, target {args.rate:.0f})")
+    for p in (50, 99, 99.9):
+        print(f"p{p}: {1e6*percentile(latencies, p):.0f} us")
+    print(f"max: {1e6*latencies[-1]:.0f} us")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=None, help='gateway port; starts one in-process if omitted')
+    parser.add_argument('--rate', type=float, default=20000, help='total messages per second')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--clients', type=int, default=4)
+    asyncio.run(main(parser.parse_args()))
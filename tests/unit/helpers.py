@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import Side, LimitOrder, MarketOrder, CancelOrder
+from collections import Counter
+from random import Random
+
+def create_orders(seed, numOrders, first=0, cancels=0.1, markets=0.1, sizes=(1, 100), prices=(1, 10),
+                  marketSizes=None, signed=True):
+    """
+    Seeded mix of cancels, market and limit orders with ids first, first + 1, ...
+
+    cancels and markets are the shares of each kind, the rest are limit
+    orders. A cancel names a random earlier id, which may be gone already.
+    Limit orders carry a random signature unless signed is False.
+    """
+    rng = Random(seed)
+    orders = []
+    for n in range(first, first + numOrders):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        r = rng.random()
+        if r < cancels:
+            orders.append(CancelOrder(rng.randrange(n + 1)))
+        elif r < cancels + markets:
+            orders.append(MarketOrder(n, side, rng.randint(*(marketSizes or sizes)), trader_id=f"0x{n:040x}"))
+        elif signed:
+            orders.append(LimitOrder(n, side, rng.randint(*sizes), rng.randint(*prices), trader_id=f"0x{n:040x}",
+                                     v=27, r=rng.randbytes(32), s=rng.randbytes(32)))
+        else:
+            orders.append(LimitOrder(n, side, rng.randint(*sizes), rng.randint(*prices), trader_id=f"0x{n:040x}"))
+    return orders
+
+def state(book):
+    """
+    Everything about the resting orders of a book, level by level in priority order
+    """
+    levels = [(level.price, level.volume, [(o.order_id, o.remainingToFill, o.r, o.seq) for o in level])
+              for side in (book.bids, book.asks) for level in side.levels.values()]
+    return levels, book.getBid(), book.getAsk(), len(book), sorted(book.orders), book.nextOrderSeq
+
+def fills(book):
+    return [(t.maker_order_id, t.taker_order_id, t.price, t.size, t.buyer_id, t.r_maker) for t in book.trades]
+
+class MockRPC:
+    """
+    Stand-in for a node's JSON-RPC endpoint that counts round trips per method
+    """
+    def __init__(self, transaction_count=7, gas_price=10**9):
+        self.calls = Counter()
+        self.transaction_count = transaction_count
+        self.price = gas_price
+
+    def request(self, method, params=()):
+        self.calls[method] += 1
+        if method == 'eth_getTransactionCount':
+            return self.transaction_count
+        if method == 'eth_gasPrice':
+            return self.price
+        raise ValueError(f"unsupported method {method}")
+
+class MockEth:
+    """
+    The part of web3.eth the settlement helpers use, backed by a MockRPC
+    """
+    def __init__(self, rpc):
+        self.rpc = rpc
+
+    def get_transaction_count(self, address, block_identifier='latest'):
+        return self.rpc.request('eth_getTransactionCount', (address, block_identifier))
+
+    @property
+    def gas_price(self):
+        return self.rpc.request('eth_gasPrice')
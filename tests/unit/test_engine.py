@@ -0,0 +1,41 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Engine import EngineManager, shardOf
+from tests.unit.helpers import create_orders
+from random import Random
+
+CASH = "0x5615dEB798BB3E4dFa0139dFa1b3D433Cc23b72f"
+INSTRUMENTS = [(CASH, "0x%040x" % n) for n in range(6)]
+
+def routed_orders(seed):
+    rng = Random(seed)
+    orders = create_orders(seed, 600, cancels=0, markets=0, sizes=(1, 50), prices=(1, 4), signed=False)
+    return [(INSTRUMENTS[rng.randrange(len(INSTRUMENTS))], order) for order in orders]
+
+def summary(trades):
+    return sorted((instrument, t.seq, t.maker_order_id, t.taker_order_id, t.size) for instrument, t in trades)
+
+def test_shardedMatchesInline():
+    with EngineManager(workers=0) as inline:
+        expected = inline.process(routed_orders(1))
+        expectedTop = inline.top(INSTRUMENTS[0])
+
+    with EngineManager(workers=3) as engine:
+        trades = engine.process(routed_orders(1)[:300])
+        trades += engine.process(routed_orders(1)[300:])
+        assert engine.top(INSTRUMENTS[0]) == expectedTop
+
+    assert summary(trades) == summary(expected)
+
+    # Sequence numbers are dense and ordered within each instrument
+    for instrument in INSTRUMENTS:
+        seqs = [t.seq for i, t in trades if i == instrument]
+        assert seqs == list(range(len(seqs)))
+
+def test_shardOf():
+    shards = {shardOf(instrument, 4) for instrument in INSTRUMENTS}
+    assert shards <= {0, 1, 2, 3}
+    assert shardOf(INSTRUMENTS[0], 4) == shardOf(tuple(INSTRUMENTS[0]), 4)
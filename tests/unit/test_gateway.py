@@ -0,0 +1,146 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Gateway import *
+from OrderMatchingEngine.Wire import MESSAGE, encode
+import asyncio
+
+async def read_reports(reader, count):
+    reports = []
+    for _ in range(count):
+        reports.append(REPORT.unpack(await reader.readexactly(REPORT.size)))
+    return reports
+
+async def exchange():
+    gateway = await Gateway().start()
+    try:
+        makerReader, makerWriter = await asyncio.open_connection(gateway.host, gateway.port)
+        takerReader, takerWriter = await asyncio.open_connection(gateway.host, gateway.port)
+
+        makerWriter.write(encode(LimitOrder(1, Side.SELL, 10, 100)) + encode(LimitOrder(2, Side.SELL, 10, 101)))
+        makerAcks = await read_reports(makerReader, 2)
+
+        takerWriter.write(encode(LimitOrder(3, Side.BUY, 15, 101)))
+        takerReports = await read_reports(takerReader, 3)
+        makerFills = await read_reports(makerReader, 2)
+
+        makerWriter.write(encode(CancelOrder(2)) + encode(CancelOrder(1)))
+        cancels = await read_reports(makerReader, 2)
+
+        for writer in (makerWriter, takerWriter):
+            writer.close()
+        return makerAcks, takerReports, makerFills, cancels
+    finally:
+        await gateway.close()
+
+def test_gateway():
+    makerAcks, takerReports, makerFills, cancels = asyncio.run(exchange())
+    assert makerAcks == [(REPORT_ACK, 1, 0, 100, 10, -1), (REPORT_ACK, 2, 0, 101, 10, -1)]
+    assert takerReports == [(REPORT_ACK, 3, 15, 101, 0, -1),
+                            (REPORT_FILL, 3, 10, 100, 0, 0),
+                            (REPORT_FILL, 3, 5, 101, 0, 1)]
+    assert makerFills == [(REPORT_FILL, 1, 10, 100, 0, 0), (REPORT_FILL, 2, 5, 101, 5, 1)]
+    assert cancels == [(REPORT_CANCELLED, 2, 5, 0, 0, -1), (REPORT_REJECTED, 1, 0, 0, 0, -1)]
+
+async def guarded():
+    gateway = await Gateway().start()
+    try:
+        aliceReader, aliceWriter = await asyncio.open_connection(gateway.host, gateway.port)
+        bobReader, bobWriter = await asyncio.open_connection(gateway.host, gateway.port)
+
+        aliceWriter.write(encode(LimitOrder(1, Side.SELL, 10, 100)))
+        aliceAck = await read_reports(aliceReader, 1)
+
+        # Bob can neither cancel Alice's order nor reuse its id
+        bobWriter.write(encode(CancelOrder(1)) + encode(LimitOrder(1, Side.SELL, 5, 105)))
+        bobReports = await read_reports(bobReader, 2)
+
+        # A frame with side 7 is rejected, and the connection stays usable
+        bad = list(MESSAGE.unpack(encode(LimitOrder(2, Side.BUY, 5, 90))))
+        bad[1] = 7
+        bobWriter.write(MESSAGE.pack(*bad) + encode(LimitOrder(3, Side.BUY, 5, 90)))
+        bobReports += await read_reports(bobReader, 2)
+
+        aliceWriter.write(encode(CancelOrder(1)))
+        aliceReports = aliceAck + await read_reports(aliceReader, 1)
+
+        for writer in (aliceWriter, bobWriter):
+            writer.close()
+        return aliceReports, bobReports, len(gateway.book)
+    finally:
+        await gateway.close()
+
+def test_gateway_guards():
+    aliceReports, bobReports, resting = asyncio.run(guarded())
+    assert bobReports == [(REPORT_REJECTED, 1, 0, 0, 0, -1), (REPORT_REJECTED, 1, 0, 0, 0, -1),
+                          (REPORT_REJECTED, 2, 0, 0, 0, -1), (REPORT_ACK, 3, 0, 90, 5, -1)]
+    assert aliceReports == [(REPORT_ACK, 1, 0, 100, 10, -1), (REPORT_CANCELLED, 1, 10, 0, 0, -1)]
+    assert resting == 1
+
+class StuckTransport(object):
+    def get_write_buffer_size(self):
+        return 2**20
+
+    def get_write_buffer_limits(self):
+        return 0, 2**16
+
+class StuckWriter(object):
+    transport = StuckTransport()
+
+    def __init__(self):
+        self.closed = False
+
+    def is_closing(self):
+        return self.closed
+
+    def write(self, data):
+        pass
+
+    async def drain(self):
+        await asyncio.sleep(10)
+
+    def close(self):
+        self.closed = True
+
+def test_slow_consumer_closed():
+    gateway = Gateway(drainTimeout=0.01)
+    writer = StuckWriter()
+    gateway.processBatch([(LimitOrder(1, Side.BUY, 10, 100), writer)])
+    asyncio.run(gateway._drain())
+    assert writer.closed
+    assert gateway.written == set()
+
+class RecordingWriter(object):
+    def __init__(self):
+        self.reports = []
+
+    def is_closing(self):
+        return False
+
+    def write(self, data):
+        self.reports.append(REPORT.unpack(data))
+
+def test_fill_then_cancel_in_one_batch():
+    gateway = Gateway()
+    alice, bob = RecordingWriter(), RecordingWriter()
+    gateway.processBatch([(LimitOrder(1, Side.SELL, 10, 100), alice),
+                          (LimitOrder(2, Side.BUY, 4, 100), bob),
+                          (CancelOrder(1), alice)])
+    assert alice.reports == [(REPORT_ACK, 1, 0, 100, 10, -1),
+                             (REPORT_CANCELLED, 1, 6, 0, 0, -1),
+                             (REPORT_FILL, 1, 4, 100, 0, 0)]
+    assert bob.reports == [(REPORT_ACK, 2, 4, 100, 0, -1), (REPORT_FILL, 2, 4, 100, 0, 0)]
+    assert gateway.owners == {}
+
+def test_non_positive_size_or_price_rejected():
+    gateway = Gateway()
+    alice, bob = RecordingWriter(), RecordingWriter()
+    gateway.processBatch([(LimitOrder(1, Side.SELL, 10, 100), alice),
+                          (LimitOrder(2, Side.BUY, -5, 100), bob),
+                          (MarketOrder(3, Side.BUY, 0), bob),
+                          (LimitOrder(4, Side.BUY, 5, 0), bob)])
+    assert bob.reports == [(REPORT_REJECTED, n, 0, 0, 0, -1) for n in (2, 3, 4)]
+    assert gateway.book.getOrder(1).remainingToFill == 10
+    assert len(gateway.book.trades) == 0
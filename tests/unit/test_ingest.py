@@ -0,0 +1,38 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.ingest_orders import iter_order_records, stream_orders_into_book, convert_to_limit_order
+import json
+
+def create_records(numOrders):
+    return [{'orderId': n, 'side': n % 2, 'size': 10 + n % 7, 'price': 100 + n % 3,
+             'trader': f"0x{n:040x}", 'signatureType': 'EIP-712', 'v': 27,
+             'r': '0x' + '11' * 32, 's': '0x' + '22' * 32} for n in range(numOrders)]
+
+def test_streamFormats(tmp_path):
+    records = create_records(500)
+    arrayPath = tmp_path / 'orders.json'
+    arrayPath.write_text(json.dumps(records, indent=2))
+    ndjsonPath = tmp_path / 'orders.ndjson'
+    ndjsonPath.write_text('\n'.join(json.dumps(r) for r in records) + '\n')
+
+    # Chunks far smaller than one record still parse
+    assert list(iter_order_records(str(arrayPath), chunk_bytes=7)) == records
+    assert list(iter_order_records(str(ndjsonPath))) == records
+
+def test_streamIntoBook(tmp_path):
+    records = create_records(1000)
+    path = tmp_path / 'orders.json'
+    path.write_text(json.dumps(records))
+
+    expected = Orderbook()
+    for record in records:
+        expected.processOrder(convert_to_limit_order(record))
+
+    book = Orderbook()
+    count, _ = stream_orders_into_book(book, str(path), chunk_size=64, report=False)
+    assert count == 1000
+    assert len(book.trades) == len(expected.trades)
+    assert (book.getBid(), book.getAsk(), len(book)) == (expected.getBid(), expected.getAsk(), len(expected))
@@ -0,0 +1,103 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Journal import Journal, readJournal, replay
+from tests.unit.helpers import create_orders, state, fills
+import pytest
+from decimal import Decimal
+
+def test_replay(tmp_path):
+    path = str(tmp_path / 'orders.journal')
+    orders = create_orders(1, 500)
+    with Journal(path, groupSize=64) as journal:
+        book = Orderbook(journal=journal)
+        for order in orders[:200]:
+            book.processOrder(order)
+        book.process_batch(orders[200:])
+        assert journal.commits < len(orders)
+
+    journaled = readJournal(path)
+    assert len(journaled) == len(orders)
+    assert journaled[5].__class__ == orders[5].__class__
+    replayed = replay(path)
+    assert (fills(replayed), state(replayed)) == (fills(book), state(book))
+
+def test_tornTail(tmp_path):
+    path = str(tmp_path / 'orders.journal')
+    orders = create_orders(2, 50)
+    with Journal(path) as journal:
+        journal.extend(orders)
+    with open(path, 'ab') as f:
+        f.write(b'\x40\x00\x00\x00partial')
+
+    assert len(readJournal(path)) == 50
+    # Reopening drops the torn record and appends after the last good one
+    with Journal(path) as journal:
+        journal.append(CancelOrder(3))
+    journaled = readJournal(path)
+    assert len(journaled) == 51
+    assert journaled[-1].order_id == 3
+
+def test_wideValues(tmp_path):
+    path = str(tmp_path / 'orders.journal')
+    orders = [LimitOrder('a', Side.SELL, 5, 100.5, trader_id='0xabc'),
+              LimitOrder(2**70, Side.SELL, 5, 101),
+              MarketOrder(-2**64, Side.BUY, 7),
+              CancelOrder('a'),
+              LimitOrder(3, Side.BUY, 2, 99)]
+    with Journal(path) as journal:
+        book = Orderbook(journal=journal)
+        for order in orders:
+            book.processOrder(order)
+
+    journaled = readJournal(path)
+    assert [(o.__class__, o.order_id, o.price, o.remainingToFill) for o in journaled] == \
+        [(LimitOrder, 'a', 100.5, 5), (LimitOrder, 2**70, 101, 5), (MarketOrder, -2**64, None, 7),
+         (CancelOrder, 'a', None, None), (LimitOrder, 3, 99, 2)]
+    assert journaled[0].trader_id == '0xabc'
+    replayed = replay(path)
+    assert (fills(replayed), state(replayed)) == (fills(book), state(book))
+
+    with Journal(path) as journal:
+        with pytest.raises(TypeError, match='price'):
+            journal.append(LimitOrder(4, Side.BUY, 1, Decimal('99.5')))
+
+def test_corruptMiddle(tmp_path):
+    path = str(tmp_path / 'orders.journal')
+    with Journal(path) as journal:
+        journal.extend(create_orders(5, 100))
+    size = os.path.getsize(path)
+    with open(path, 'r+b') as f:
+        f.seek(size // 2)
+        byte = f.read(1)
+        f.seek(size // 2)
+        f.write(bytes([byte[0] ^ 0xff]))
+
+    # not a torn tail: opening refuses instead of cutting off the rest
+    with pytest.raises(ValueError):
+        Journal(path)
+    assert os.path.getsize(path) == size
+
+def test_idleFlush(tmp_path):
+    path = str(tmp_path / 'orders.journal')
+    orders = create_orders(3, 3)
+    with Journal(path, groupSize=64, groupInterval=0.5) as journal:
+        ends = [journal.append(order) for order in orders]
+        assert journal.buffered > 0
+        # the flush thread commits the tail without another message arriving
+        assert journal.waitDurable(ends[-1], timeout=5)
+        assert journal.buffered == 0
+        assert journal.durable == ends[-1] == os.path.getsize(path)
+        assert len(readJournal(path)) == 3
+
+def test_durablePosition(tmp_path):
+    path = str(tmp_path / 'orders.journal')
+    orders = create_orders(4, 20)
+    with Journal(path, groupSize=64, groupInterval=60, autoFlush=False) as journal:
+        end = journal.append(orders[0])
+        assert journal.durable == 0
+        assert not journal.waitDurable(end, timeout=0)
+        assert journal.extend(orders[1:]) == journal.durable == os.path.getsize(path)
+        assert journal.waitDurable(end, timeout=0)
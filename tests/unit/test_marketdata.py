@@ -0,0 +1,66 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.MarketData import MarketDataFeed, DepthUpdate, TopOfBook
+from random import Random
+
+def test_depth_updates():
+    feed = MarketDataFeed()
+    book = Orderbook(feed=feed)
+    book.processOrder(LimitOrder(0, Side.SELL, 5, 10))
+    book.processOrder(LimitOrder(1, Side.SELL, 3, 10))
+    book.processOrder(LimitOrder(2, Side.SELL, 4, 11))
+    feed.drain()
+
+    # sweeps the 10 level and takes 1 from the 11 level
+    book.processOrder(MarketOrder(3, Side.BUY, 9))
+    updates = feed.drain()
+    depth = [(u.side, u.price, u.size) for u in updates if isinstance(u, DepthUpdate)]
+    assert depth == [(Side.SELL, 10, 0), (Side.SELL, 11, 3)]
+    top = updates[-1]
+    assert isinstance(top, TopOfBook)
+    assert (top.bid, top.bidSize, top.ask, top.askSize) == (None, 0, 11, 3)
+    assert [u.seq for u in updates] == list(range(updates[0].seq, updates[0].seq + len(updates)))
+
+    book.processOrder(CancelOrder(2))
+    updates = feed.drain()
+    assert (updates[0].price, updates[0].size) == (11, 0)
+    assert updates[1].ask is None
+
+def test_top_of_book_only_on_change():
+    feed = MarketDataFeed()
+    book = Orderbook(feed=feed)
+    book.processOrder(LimitOrder(0, Side.BUY, 5, 10))
+    book.processOrder(LimitOrder(1, Side.BUY, 5, 9))
+    updates = feed.drain()
+    assert [type(u) for u in updates] == [DepthUpdate, TopOfBook, DepthUpdate]
+
+def test_replica_matches_depth():
+    rng = Random(14)
+    replica = {Side.BUY: {}, Side.SELL: {}}
+
+    def apply(update):
+        if isinstance(update, DepthUpdate):
+            if update.size:
+                replica[update.side][update.price] = update.size
+            else:
+                replica[update.side].pop(update.price, None)
+
+    book = Orderbook(feed=MarketDataFeed(apply))
+    for n in range(3000):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        r = rng.random()
+        if r < 0.15:
+            book.processOrder(CancelOrder(rng.randrange(n + 1)))
+        elif r < 0.25:
+            book.processOrder(MarketOrder(n, side, rng.randint(1, 50)))
+        else:
+            book.processOrder(LimitOrder(n, side, rng.randint(1, 50), rng.randint(90, 110)))
+
+    depth = book.depth(levels=None)
+    assert sorted(replica[Side.BUY].items(), reverse=True) == [(p, v) for p, v, _ in depth['bids']]
+    assert sorted(replica[Side.SELL].items()) == [(p, v) for p, v, _ in depth['asks']]
+    assert depth['seq'] == book.feed.seq
+    assert book.depth(levels=3)['bids'] == depth['bids'][:3]
@@ -0,0 +1,56 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.netting import net_trades, NettedTrade
+from random import Random
+
+def test_sweep_nets_per_price():
+    OB = Orderbook()
+    maker, taker = "0x" + "aa" * 20, "0x" + "bb" * 20
+    for n in range(30):
+        OB.processOrder(LimitOrder(n, Side.SELL, 5, 10 + n % 2, trader_id=maker))
+    OB.processOrder(LimitOrder(100, Side.BUY, 200, 11, trader_id=taker))
+    assert len(OB.trades) == 30
+
+    netted = net_trades(OB.trades)
+    assert [(t.price, t.size, t.fills) for t in netted] == [(10, 75, 15), (11, 75, 15)]
+    assert all(isinstance(t, Trade) for t in netted)
+    assert netted[0].maker_order_ids == list(range(0, 30, 2))
+    assert netted[0].taker_order_ids == [100] * 15
+    assert netted[0].maker_order_id == 0 and netted[0].buyer_id == taker
+
+    # fills are only netted within their window
+    assert [t.fills for t in net_trades(OB.trades, window=10)] == [10, 5, 5, 10]
+
+def test_net_trades_keeps_volume():
+    rng = Random(20)
+    traders = ["0x%040x" % n for n in range(5)]
+    OB = Orderbook()
+    for n in range(3000):
+        side = Side.BUY if rng.getrandbits(1) else Side.SELL
+        trader = rng.choice(traders + [None])
+        OB.processOrder(LimitOrder(n, side, rng.randint(1, 50), rng.randint(1, 4), trader_id=trader))
+    trades = list(OB.trades)
+    netted = net_trades(trades)
+    assert len(netted) < len(trades)
+    assert sorted(seq for t in netted for seq in t.seqs) == [t.seq for t in trades]
+    for record in netted:
+        fills = [trades[seq] for seq in record.seqs]
+        assert record.size == sum(t.size for t in fills)
+        assert {(t.buyer_id, t.seller_id, t.price) for t in fills} == {(record.buyer_id, record.seller_id, record.price)}
+        if record.buyer_id is None or record.seller_id is None:
+            assert record.fills == 1
+
+def test_maker_role_not_netted():
+    OB = Orderbook()
+    a, b = "0x" + "aa" * 20, "0x" + "bb" * 20
+    # A rests a sell that B hits, then B rests a buy that A hits
+    OB.processOrder(LimitOrder(0, Side.SELL, 5, 10, trader_id=a))
+    OB.processOrder(LimitOrder(1, Side.BUY, 5, 10, trader_id=b))
+    OB.processOrder(LimitOrder(2, Side.BUY, 5, 10, trader_id=b))
+    OB.processOrder(LimitOrder(3, Side.SELL, 5, 10, trader_id=a))
+
+    netted = net_trades(OB.trades)
+    assert [(t.maker_order_ids, t.size, t.taker_side) for t in netted] == [([0], 5, Side.BUY), ([2], 5, Side.SELL)]
@@ -3,33 +3,87 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from OrderMatchingEngine import *
+from OrderMatchingEngine.OGOrderbook import Orderbook as OGOrderbook
+import pytest
 
 def test_initialStates():
     order = Order(1)
     assert isinstance(order.order_id, int)
-    assert isinstance(order.time, int)
+    assert order.seq is None
     assert order.order_id == 1
 
 
     order = CancelOrder(1)
     assert isinstance(order.order_id, int)
-    assert isinstance(order.time, int)
+    assert order.seq is None
     assert order.order_id == 1
     
 
     order = MarketOrder(1, Side.BUY, 10)
     assert isinstance(order.order_id, int)
-    assert isinstance(order.time, int)
+    assert order.seq is None
     assert order.order_id == 1
     assert order.side == Side.BUY
     assert order.size == 10
 
     order = LimitOrder(1, Side.BUY, 10, 100)
     assert isinstance(order.order_id, int)
-    assert isinstance(order.time, int)
+    assert order.seq is None
     assert order.order_id == 1
     assert order.side == Side.BUY
     assert order.size == 10
     assert order.price == 100
 
 
+
+def test_seq_assigned_by_book():
+    OB = Orderbook()
+    orders = [LimitOrder(n, Side.BUY, 10, 100) for n in range(3)]
+    for order in reversed(orders):  # built first, accepted in reverse
+        OB.processOrder(order)
+    assert [order.seq for order in orders] == [2, 1, 0]
+    assert orders[2] < orders[1] < orders[0]
+    OB.processOrder(MarketOrder(3, Side.SELL, 15))
+    assert [t.maker_order_id for t in OB.trades] == [2, 1]
+
+def test_sort_key():
+    assert sortKey(Side.BUY, 101, 5) < sortKey(Side.BUY, 100, 0) < sortKey(Side.BUY, 100, 1)
+    assert sortKey(Side.SELL, 100, 5) < sortKey(Side.SELL, 101, 0) < sortKey(Side.SELL, 101, 1)
+
+    OB = OGOrderbook()
+    bids = [LimitOrder(0, Side.BUY, 10, 100), LimitOrder(1, Side.BUY, 10, 101), LimitOrder(2, Side.BUY, 10, 100)]
+    asks = [LimitOrder(3, Side.SELL, 10, 103), LimitOrder(4, Side.SELL, 10, 102)]
+    for order in bids + asks:
+        OB.processOrder(order)
+    assert [o.order_id for o in OB.bids] == [1, 0, 2]
+    assert [o.order_id for o in OB.asks] == [4, 3]
+    assert OB.bids.key(bids[1]) == sortKey(Side.BUY, 101, bids[1].seq)
+    assert bids[1] < bids[0] < bids[2]
+
+def test_lt_without_sort_key():
+    # orders no book has accepted, and non-integer prices, still compare
+    assert LimitOrder(0, Side.BUY, 10, 101) < LimitOrder(1, Side.BUY, 10, 100)
+    assert not LimitOrder(0, Side.SELL, 10, 100) < LimitOrder(1, Side.SELL, 10, 100)
+    accepted, pending = LimitOrder(0, Side.SELL, 10, 100.5), LimitOrder(1, Side.SELL, 10, 100.5)
+    accepted.seq = 3
+    assert accepted < pending and not pending < accepted
+    assert LimitOrder(2, Side.SELL, 10, 100.25) < accepted
+
+    # the legacy book sorts on the priority tuple once a price is not an int
+    OB = OGOrderbook()
+    OB.processOrder(LimitOrder(3, Side.BUY, 10, 99))
+    OB.processOrder(LimitOrder(4, Side.BUY, 10, 99.5))
+    OB.processOrder(LimitOrder(5, Side.BUY, 10, 99))
+    assert [o.order_id for o in OB.bids] == [4, 3, 5]
+    OB.processOrder(LimitOrder(6, Side.SELL, 10, 100))
+    OB.processOrder(CancelOrder(4))
+    assert [o.order_id for o in OB.bids] == [3, 5] and OB.getAsk() == 100
+
+def test_slots():
+    order = LimitOrder(1, Side.BUY, 10, 100, trader_id='0xabc', v=27, r=b'r', s=b's')
+    assert not hasattr(order, '__dict__') and not hasattr(order, 'key')
+    assert (order.v, order.r, order.s) == (27, b'r', b's')
+
+    trade = Trade(0, 1, 100, 10, '0xabc', '0xdef', 'EIP-712', 27, b'r', b's', 28, b'r', b's')
+    assert not hasattr(trade, '__dict__')
+    assert trade.v_taker == 28
@@ -1,5 +1,6 @@
 import sys
 import os
+import pytest
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from OrderMatchingEngine import *
@@ -35,11 +36,110 @@ def testExecution_marmooli():
     book = Orderbook()
     order = LimitOrder(0, Side.SELL, 5, 105)
     book.processOrder(order)
-    order = LimitOrder(0, Side.SELL, 5, 106)
+    order = LimitOrder(1, Side.SELL, 5, 106)
     book.processOrder(order)
-    order = LimitOrder(0, Side.BUY, 1, 105)
+    order = LimitOrder(2, Side.BUY, 1, 105)
     trade = book.processOrder(order)
     assert len(book) == 2
     assert book.getBid() == None
     assert book.getAsk() == 105
-    assert len(book.trades)==1
\ No newline at end of file
+    assert len(book.trades)==1
+
+def testDuplicateLiveId():
+    book = Orderbook()
+    book.processOrder(LimitOrder(0, Side.SELL, 5, 105))
+    with pytest.raises(ValueError):
+        book.processOrder(LimitOrder(0, Side.SELL, 5, 106))
+    with pytest.raises(ValueError):
+        book.processOrder(MarketOrder(0, Side.BUY, 1))
+    assert len(book) == len(book.orders) == 1
+    assert book.getAsk() == 105
+    assert len(book.trades) == 0
+
+    reports = book.process_batch([LimitOrder(0, Side.SELL, 5, 106), CancelOrder(0), CancelOrder(0)])
+    assert reports[0].rejected and (reports[0].filled, reports[0].remaining, reports[0].resting) == (0, 5, False)
+    assert reports[1].cancelled is not None and reports[2].cancelled is None
+    assert len(book) == len(book.orders) == book.stats()['restingOrders'] == 0
+
+    # an id is free again once its order has left the book
+    book.processOrder(LimitOrder(0, Side.SELL, 5, 105))
+    assert book.getOrder(0).remainingToFill == 5
+
+def testPriceLevels():
+    book = Orderbook()
+    book.processOrder(LimitOrder(0, Side.SELL, 5, 105))
+    book.processOrder(LimitOrder(1, Side.SELL, 7, 105))
+    book.processOrder(LimitOrder(2, Side.SELL, 5, 106))
+    assert len(book.asks.levels) == 2
+    assert book.asks.best.price == 105
+    assert book.asks.best.volume == 12
+
+    # The first order at a price is filled first
+    book.processOrder(LimitOrder(3, Side.BUY, 6, 105))
+    assert [t.maker_order_id for t in book.trades] == [0, 1]
+    assert book.asks.best.volume == 6
+    assert len(book) == 2
+
+    book.processOrder(MarketOrder(4, Side.BUY, 6))
+    assert book.getAsk() == 106
+    assert len(book.asks.levels) == 1
+
+
+def testCancel():
+    book = Orderbook()
+    book.processOrder(LimitOrder(0, Side.BUY, 10, 10))
+    book.processOrder(LimitOrder(1, Side.BUY, 10, 9))
+    book.processOrder(LimitOrder(2, Side.SELL, 4, 10))
+    assert book.getOrder(0).remainingToFill == 6
+    assert book.bids.best.volume == 6
+
+    book.processOrder(CancelOrder(0))
+    assert book.getOrder(0) is None
+    assert book.getBid() == 9
+    assert len(book) == 1
+
+    # Fully filled orders leave the index, cancelling them is a no-op
+    book.processOrder(LimitOrder(3, Side.SELL, 10, 9))
+    assert book.getOrder(1) is None
+    book.processOrder(CancelOrder(1))
+    assert len(book) == 0
+    assert book.orders == {}
+
+
+def testProcessBatch():
+    book = Orderbook()
+    reports = book.process_batch([
+        LimitOrder(0, Side.SELL, 5, 105),
+        LimitOrder(1, Side.SELL, 5, 106),
+        LimitOrder(2, Side.BUY, 7, 106),
+        MarketOrder(3, Side.BUY, 10),
+        CancelOrder(1),
+        CancelOrder(2),
+        LimitOrder(4, Side.BUY, 3, 100),
+        CancelOrder(4),
+    ])
+    assert [r.order.order_id for r in reports] == [0, 1, 2, 3, 1, 2, 4, 4]
+    assert (reports[0].filled, reports[0].remaining, reports[0].resting) == (0, 5, True)
+    assert (reports[2].filled, reports[2].remaining, reports[2].resting) == (7, 0, False)
+    assert [book.trades.trade(seq).maker_order_id for seq in reports[2].trades] == [0, 1]
+    assert (reports[3].filled, reports[3].remaining, reports[3].resting) == (3, 7, False)
+    assert reports[4].cancelled is None
+    assert reports[5].cancelled is None
+    assert reports[7].cancelled is reports[6].order
+    assert len(book) == 0
+
+
+def testPartialFillKeepsPriority():
+    book = Orderbook()
+    head = LimitOrder(0, Side.BUY, 10, 10)
+    book.processOrder(head)
+    book.processOrder(LimitOrder(1, Side.BUY, 10, 10))
+
+    book.processOrder(MarketOrder(2, Side.SELL, 3))
+    assert next(iter(book.bids.best.orders)) is head
+    assert head.remainingToFill == 7
+
+    book.processOrder(MarketOrder(3, Side.SELL, 8))
+    assert [(t.maker_order_id, t.size) for t in book.trades] == [(0, 3), (0, 7), (1, 1)]
+    assert book.getOrder(0) is None
+    assert book.bids.best.volume == 9
@@ -3,10 +3,14 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from OrderMatchingEngine import Order, Orderbook, Side, LimitOrder
-from OrderMatchingEngine.PackagerV2 import create_settlement_ready_trades, serialize_settlement_ready_trades
+from OrderMatchingEngine.PackagerV2 import create_settlement_ready_trades, serialize_settlement_ready_trades, package_trades
+from OrderMatchingEngine.PackagerV2 import PackagedTradeWriter, stream_settlement_ready_trades, iter_packaged_trades
+from OrderMatchingEngine.PackagerV2 import submit_trades_for_settlement
+from tests.unit.helpers import MockRPC, MockEth
 from random import getrandbits, randint
 import json
 import secrets
+import threading
 
 def create_random_signature():
     signature_type = 'EIP-712'
@@ -59,5 +63,99 @@ def test_serialization():
         json.dump(serialized_trades, f, indent=2)
     print("\nAll serialized trades have been saved to 'test_serialized_trades.json'")
 
+def test_package_trades():
+    OB = Orderbook()
+    for n in range(2000):
+        side = Side.BUY if bool(getrandbits(1)) else Side.SELL
+        order = LimitOrder(n, side, randint(1, 200), randint(1, 4), trader_id=f"0x{n:040x}")
+        order.set_signature(*create_random_signature())
+        OB.processOrder(order)
+    fee_recipient = "0xfedc000000000000000000000000000000000000"
+
+    serial = serialize_settlement_ready_trades(create_settlement_ready_trades(OB.trades, fee_recipient))
+    parallel = package_trades(OB.trades, fee_recipient, workers=2, chunk_size=100)
+    assert len(parallel) == len(serial) > 100
+    # salt and expiration come from the clock
+    for a, b in zip(serial, parallel):
+        for key in ('salt', 'expiration'):
+            del a[key], b[key]
+    assert parallel == serial
+
+def test_settlement_addresses_are_checksummed():
+    # trader ids decoded off the wire are lowercase hex
+    buyer, seller = "0x5615deb798bb3e4dfa0139dfa1b3d433cc23b72f", "0x3c44cdddb6a900fa2b585dd299e03d12fa4293bc"
+    OB = Orderbook()
+    for n, (side, trader) in enumerate(((Side.SELL, seller), (Side.BUY, buyer))):
+        order = LimitOrder(n, side, 10, 100, trader_id=trader)
+        order.set_signature(*create_random_signature())
+        OB.processOrder(order)
+    [trade] = create_settlement_ready_trades(OB.trades, "0xfedc000000000000000000000000000000000000")
+    assert (trade.maker, trade.taker) == ("0x3C44CdddB6a900fa2b585dd299e03d12FA4293BC",
+                                          "0x5615dEB798BB3E4dFa0139dFa1b3D433Cc23b72f")
+
+def test_stream_settlement_ready_trades(tmp_path):
+    OB = Orderbook()
+    for n in range(500):
+        side = Side.BUY if bool(getrandbits(1)) else Side.SELL
+        order = LimitOrder(n, side, randint(1, 200), randint(1, 4), trader_id=f"0x{n:040x}")
+        order.set_signature(*create_random_signature())
+        OB.processOrder(order)
+    fee_recipient = "0xfedc000000000000000000000000000000000000"
+    expected = [(t['maker'], t['taker'], t['makerAmount'], t['takerAmount'], t['maker_r'])
+                for t in serialize_settlement_ready_trades(create_settlement_ready_trades(OB.trades, fee_recipient))]
+
+    for fmt in ('json', 'ndjson'):
+        path = tmp_path / f"trades.{fmt}"
+        assert stream_settlement_ready_trades(iter(OB.trades), fee_recipient, path, fmt, chunk_size=64) == len(expected)
+        streamed = list(iter_packaged_trades(path))
+        assert [(t['maker'], t['taker'], t['makerAmount'], t['takerAmount'], t['maker_r']) for t in streamed] == expected
+    with open(tmp_path / "trades.json") as f:
+        assert len(json.load(f)) == len(expected)
+
+def test_tail_packaged_trades(tmp_path):
+    path = tmp_path / "trades.json"
+    writer = PackagedTradeWriter(path, flush_every=1)
+    read = []
+    tail = threading.Thread(target=lambda: read.extend(iter_packaged_trades(path, follow=True, poll_interval=0.001)))
+    tail.start()
+    for n in range(100):
+        writer.write({'salt': str(n)})
+    writer.file.write('{"salt":')  # a torn line is not read until it is complete
+    writer.file.flush()
+    writer.file.write('"100"}\n')
+    writer.count += 1
+    writer.close()
+    tail.join(5)
+    assert [t['salt'] for t in read] == [str(n) for n in range(101)]
+
+def test_submit_trades_round_trips():
+    class Call:
+        def build_transaction(self, tx):
+            return tx
+
+    class Contract:
+        class functions:
+            @staticmethod
+            def fillLimitOrder(*args):
+                return Call()
+
+    class Web3Stub:
+        def __init__(self, rpc):
+            self.eth = MockEth(rpc)
+            self.eth.contract = lambda address, abi: Contract()
+
+    class Account:
+        address = "0x3C44CdddB6a900fa2b585dd299e03d12FA4293BC"
+
+    rpc = MockRPC(transaction_count=42)
+    signature = {'maker_r': '0x' + '00' * 32, 'maker_s': '0x' + '00' * 32,
+                 'taker_r': '0x' + '00' * 32, 'taker_s': '0x' + '00' * 32}
+    trades = [dict(signature, makerToken='', takerToken='', makerAmount='1', takerAmount='1', maker='', taker='',
+                   sender='', feeRecipient='', pool='00' * 32, expiration=0, salt='1', makerIsBuyer=True,
+                   signature_type='EIP-712', maker_v=27, taker_v=28)] * 50
+    transactions = submit_trades_for_settlement(Web3Stub(rpc), None, None, trades, Account())
+    assert [tx['nonce'] for tx in transactions] == list(range(42, 92))
+    assert rpc.calls == {'eth_getTransactionCount': 1, 'eth_gasPrice': 1}
+
 if __name__ == "__main__":
     test_serialization()
@@ -0,0 +1,75 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.MarketData import MarketDataFeed
+from OrderMatchingEngine.Profiler import PhaseProfiler
+from tests.unit.helpers import create_orders, fills
+import json
+
+# eleven price levels, and market orders big enough to walk several of them
+MIX = dict(prices=(95, 105), marketSizes=(1, 300), signed=False)
+
+def test_profiled_match_is_the_same():
+    plain = Orderbook(feed=MarketDataFeed())
+    plain.process_batch(create_orders(23, 3000, **MIX), reports=False)
+    profiled = Orderbook(feed=MarketDataFeed())
+    profiler = profiled.enableProfiling(PhaseProfiler(sampleEvery=1))
+    profiled.process_batch(create_orders(23, 3000, **MIX), reports=False)
+
+    assert fills(profiled) == fills(plain)
+    assert profiled.depth(None) == plain.depth(None)
+    assert [repr(u) for u in profiled.feed.drain()] == [repr(u) for u in plain.feed.drain()]
+    assert sum(profiler.samples.values()) == sum(1 for o in create_orders(23, 3000, **MIX) if not isinstance(o, CancelOrder))
+    assert set(profiler.totals['limit']) == {'cross', 'fill', 'trade', 'pop', 'rest', 'feed'}
+
+def test_sampling_and_output():
+    OB = Orderbook()
+    stats = OB.enableStats()
+    profiler = OB.enableProfiling(PhaseProfiler(sampleEvery=10, maxEvents=50))
+    orders = create_orders(24, 3000, **MIX)
+    OB.process_batch(orders, reports=False)
+    matched = sum(1 for o in orders if not isinstance(o, CancelOrder))
+    assert sum(profiler.samples.values()) == (matched + 9) // 10
+    # sampled orders reach the stats as well
+    assert stats.latency['limit'].count + stats.latency['market'].count == matched
+
+    for line in profiler.collapsed().splitlines():
+        stack, total = line.rsplit(' ', 1)
+        assert stack.split(';')[0] == 'match' and int(total) >= 0
+    trace = json.loads(json.dumps(profiler.chromeTrace()))
+    events = trace['traceEvents']
+    assert 0 < len(events) <= 50 and profiler.droppedSamples > 0
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+
+    OB.disableProfiling()
+    assert OB._match == OB._instrumentedMatch
+    OB.disableStats()
+    assert OB._match.__func__ is Orderbook._match
+
+def test_stats_and_profiling_in_any_order():
+    orders = create_orders(25, 1000, **MIX)
+    matched = sum(1 for o in orders if not isinstance(o, CancelOrder))
+
+    # stats off while profiling stays on
+    OB = Orderbook()
+    OB.enableStats()
+    profiler = OB.enableProfiling(PhaseProfiler(sampleEvery=10))
+    OB.disableStats()
+    OB.process_batch(orders, reports=False)
+    assert sum(profiler.samples.values()) == (matched + 9) // 10
+    assert OB.stats().keys() == {'bidLevels', 'askLevels', 'restingOrders', 'trades'}
+
+    # stats enabled after profiling do not stop it
+    OB = Orderbook()
+    profiler = OB.enableProfiling(PhaseProfiler(sampleEvery=10))
+    stats = OB.enableStats()
+    OB.process_batch(orders, reports=False)
+    assert sum(profiler.samples.values()) == (matched + 9) // 10
+    assert stats.latency['limit'].count + stats.latency['market'].count == matched
+    assert stats.fills == len(OB.trades)
+
+    OB.disableStats()
+    OB.disableProfiling()
+    assert OB._match.__func__ is Orderbook._match and OB._cancel.__func__ is Orderbook._cancel
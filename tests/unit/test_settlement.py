@@ -0,0 +1,195 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine.settlement import NonceManager, GasPriceCache, SettlementPipeline
+from tests.unit.helpers import MockRPC, MockEth
+import threading
+import pytest
+
+class TransactionNotFound(Exception):
+    pass
+
+class MockChain(MockRPC):
+    """
+    MockRPC that also accepts raw transactions and mines them: every
+    block_time seconds of clock, a block includes up to block_size pending
+    transactions in nonce order, as long as they pay at least base_fee.
+    A pending transaction is replaced by one with the same nonce paying at
+    least 10% more.
+    """
+    def __init__(self, clock, block_time=12.0, block_size=100, base_fee=10**9, **kwargs):
+        super().__init__(transaction_count=0, gas_price=base_fee, **kwargs)
+        self.clock = clock
+        self.start = clock()
+        self.block_time = block_time
+        self.block_size = block_size
+        self.base_fee = base_fee
+        self.blocks = 0
+        self.pending = {}  # nonce -> (hash, raw transaction)
+        self.receipts = {}
+        self.hashes = 0
+        self.max_pending = 0
+        self.fail_sends = set()  # trades whose first send is rejected
+        self.revert = set()  # trades whose transaction reverts
+
+    def mine(self):
+        while self.blocks < int((self.clock() - self.start) / self.block_time):
+            self.blocks += 1
+            for _ in range(self.block_size):
+                tx = self.pending.get(self.transaction_count)
+                if tx is None or tx[1]['gasPrice'] < self.base_fee:
+                    break
+                del self.pending[self.transaction_count]
+                self.transaction_count += 1
+                self.receipts[tx[0]] = {'transactionHash': tx[0], 'blockNumber': self.blocks,
+                                        'status': 0 if tx[1]['trade'] in self.revert else 1}
+
+    def request(self, method, params=()):
+        self.mine()
+        if method == 'eth_getTransactionCount':
+            self.calls[method] += 1
+            return self.transaction_count + len(self.pending)
+        if method == 'eth_gasPrice':
+            self.calls[method] += 1
+            return self.base_fee
+        self.calls[method] += 1
+        if method == 'eth_sendRawTransaction':
+            raw, = params
+            if raw['trade'] in self.fail_sends:
+                self.fail_sends.discard(raw['trade'])
+                raise ValueError("connection reset")
+            nonce = raw['nonce']
+            if nonce < self.transaction_count:
+                raise ValueError("nonce too low")
+            if nonce in self.pending and raw['gasPrice'] * 10 < self.pending[nonce][1]['gasPrice'] * 11:
+                raise ValueError("replacement transaction underpriced")
+            self.hashes += 1
+            tx_hash = f"0x{self.hashes:064x}"
+            self.pending[nonce] = (tx_hash, raw)
+            self.max_pending = max(self.max_pending, len(self.pending))
+            return tx_hash
+        if method == 'eth_getTransactionReceipt':
+            receipt = self.receipts.get(params[0])
+            if receipt is None:
+                raise TransactionNotFound(params[0])
+            return receipt
+        raise ValueError(f"unsupported method {method}")
+
+class MockChainEth(MockEth):
+    def send_raw_transaction(self, raw):
+        return self.rpc.request('eth_sendRawTransaction', (raw,))
+
+    def get_transaction_receipt(self, tx_hash):
+        return self.rpc.request('eth_getTransactionReceipt', (tx_hash,))
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+def create_pipeline(chain, clock, **kwargs):
+    eth = MockChainEth(chain)
+    build = lambda trade, nonce, gas_price: {'trade': trade, 'nonce': nonce, 'gasPrice': gas_price}
+    return SettlementPipeline(eth, NonceManager(eth, '0x' + '11' * 20), GasPriceCache(eth, clock=clock),
+                              build, clock=clock, sleep=clock.sleep, **kwargs)
+
+def test_pipeline_window():
+    clock = FakeClock()
+    chain = MockChain(clock, block_time=12.0)
+    results = create_pipeline(chain, clock, window=8, poll_interval=1.0).run(range(40))
+    assert all(r.error is None and r.receipt['status'] == 1 for r in results)
+    assert sorted(r.nonce for r in results) == list(range(40))
+    assert chain.max_pending == 8
+    assert chain.calls['eth_getTransactionCount'] == 1
+    # 5 blocks of 8, instead of one block per trade
+    assert clock.now <= 5 * 12.0 + 1.0
+    assert max(r.latency for r in results) <= 13.0
+
+def test_pipeline_reprices_stuck_transactions():
+    clock = FakeClock()
+    chain = MockChain(clock, block_time=12.0)
+    pipeline = create_pipeline(chain, clock, window=4, stuck_after=30.0)
+    pipeline.gas_prices.get()
+    chain.base_fee = 2 * 10**9  # the cached price is now too low to be mined
+    results = pipeline.run(range(4))
+    assert all(r.error is None for r in results)
+    assert all(r.attempts > 1 and r.gas_price >= chain.base_fee for r in results)
+    assert all(r.tx_hash == r.hashes[-1] for r in results)
+
+def test_pipeline_failures():
+    clock = FakeClock()
+    chain = MockChain(clock, block_time=12.0)
+    chain.fail_sends = {3, 5}
+    chain.revert = {7}
+    results = create_pipeline(chain, clock, window=4).run(range(10))
+    assert sorted(r.nonce for r in results) == list(range(10))
+    assert [r.index for r in results if r.attempts == 2] == [3, 5]
+    assert [r.index for r in results if r.error is not None] == [7]
+    assert results[7].error == 'reverted'
+
+    # a trade that can never be sent is given up after max_attempts
+    chain.fail_sends = {0}
+    results = create_pipeline(chain, clock, max_attempts=1).run([0, 1])
+    assert isinstance(results[0].error, ValueError) and results[1].error is None
+
+def test_nonces_sync_once():
+    rpc = MockRPC(transaction_count=7)
+    nonces = NonceManager(MockEth(rpc), '0x' + '11' * 20)
+    assert [nonces.next() for _ in range(1000)] == list(range(7, 1007))
+    assert rpc.calls['eth_getTransactionCount'] == 1
+
+def test_nonces_concurrent():
+    rpc = MockRPC(transaction_count=0)
+    nonces = NonceManager(MockEth(rpc), '0x' + '11' * 20)
+    taken = []
+    def take():
+        taken.extend(nonces.next() for _ in range(500))
+    threads = [threading.Thread(target=take) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(taken) == list(range(4000))
+    assert rpc.calls['eth_getTransactionCount'] == 1
+
+def test_nonces_release_and_resync():
+    rpc = MockRPC(transaction_count=3)
+    nonces = NonceManager(MockEth(rpc), '0x' + '11' * 20)
+    assert nonces.next() == 3
+    nonce = nonces.next()
+    nonces.release(nonce)
+    assert nonces.next() == 4
+
+    # a failed send: the node knows 5 transactions, ours are lost
+    rpc.transaction_count = 5
+    nonces.resync()
+    assert nonces.next() == 5
+    assert rpc.calls['eth_getTransactionCount'] == 2
+
+    # releasing anything but the latest nonce cannot be undone locally
+    nonces.next()
+    nonces.release(5)
+    assert nonces.next() == 5
+    assert rpc.calls['eth_getTransactionCount'] == 3
+
+def test_gas_price_refresh():
+    rpc = MockRPC(gas_price=100)
+    now = [0.0]
+    gas_prices = GasPriceCache(MockEth(rpc), refresh_interval=12.0, clock=lambda: now[0])
+    assert [gas_prices.get() for _ in range(100)] == [100] * 100
+    assert rpc.calls['eth_gasPrice'] == 1
+
+    rpc.price = 150
+    now[0] = 11.9
+    assert gas_prices.get() == 100
+    now[0] = 12.0
+    assert gas_prices.get() == 150
+    gas_prices.invalidate()
+    gas_prices.get()
+    assert rpc.calls['eth_gasPrice'] == 3
@@ -0,0 +1,59 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Skiplist import SkipList
+from random import Random
+
+def test_sizeAndRank():
+    rng = Random(7)
+    sl = SkipList(seed=1)
+    keys = set()
+    for n in range(2000):
+        key = rng.randint(0, 500)
+        if rng.random() < 0.3:
+            sl.pop(key)
+            keys.discard(key)
+        else:
+            sl[key] = str(key)
+            keys.add(key)
+
+    expected = sorted(keys)
+    assert len(sl) == len(expected)
+    assert list(sl.keys()) == expected
+    for i in range(0, len(expected), 17):
+        assert sl.peekitem(i) == (expected[i], str(expected[i]))
+        assert sl.index(expected[i]) == i
+    assert sl.peekitem(-1)[0] == expected[-1]
+    assert sl.bisect_left(expected[-1] + 1) == len(expected)
+
+def test_seededLayout():
+    def towers(seed):
+        sl = SkipList(seed=seed)
+        for key in range(200):
+            sl[key] = key
+        return [len(node.forward) for node in _nodes(sl)]
+
+    assert towers(3) == towers(3)
+    assert towers(3) != towers(4)
+
+def test_skiplistBackend():
+    book = Orderbook(backend='skiplist')
+    book.processOrder(LimitOrder(0, Side.SELL, 5, 106))
+    book.processOrder(LimitOrder(1, Side.SELL, 5, 105))
+    book.processOrder(LimitOrder(2, Side.BUY, 5, 100))
+    assert isinstance(book.asks.levels, SkipList)
+    assert book.getAsk() == 105
+    assert book.getBid() == 100
+
+    book.processOrder(MarketOrder(3, Side.BUY, 7))
+    assert book.getAsk() == 106
+    assert book.asks.best.volume == 3
+    assert [t.maker_order_id for t in book.trades] == [1, 0]
+
+def _nodes(sl):
+    node = sl.header.forward[0]
+    while node:
+        yield node
+        node = node.forward[0]
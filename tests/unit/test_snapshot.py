@@ -0,0 +1,70 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Journal import Journal, replay
+from OrderMatchingEngine.Snapshot import writeSnapshot, restoreSnapshot, SNAPSHOT_V1, VERSION
+from tests.unit.helpers import create_orders, state
+import pytest
+
+def test_snapshotRoundTrip(tmp_path):
+    book = Orderbook()
+    book.process_batch(create_orders(1, 400, markets=0))
+    path = str(tmp_path / 'book.snapshot')
+    size = writeSnapshot(book, path)
+    assert size == os.path.getsize(path)
+
+    restored = restoreSnapshot(path, backend='skiplist')
+    assert state(restored) == state(book)
+    assert restored.trades.nextSeq == book.trades.nextSeq
+
+    # Both books keep matching the same way
+    more = create_orders(2, 200, first=400, markets=0)
+    book.process_batch(more)
+    restored.process_batch(create_orders(2, 200, first=400, markets=0))
+    assert state(restored) == state(book)
+    assert [t.seq for t in restored.trades] == [t.seq for t in book.trades][-len(restored.trades):]
+
+def test_snapshotWithJournal(tmp_path):
+    journalPath = str(tmp_path / 'orders.journal')
+    path = str(tmp_path / 'book.snapshot')
+    with Journal(journalPath) as journal:
+        book = Orderbook(journal=journal)
+        book.process_batch(create_orders(3, 300, markets=0))
+        writeSnapshot(book, path)
+        book.process_batch(create_orders(4, 100, first=300, markets=0))
+
+    restored = restoreSnapshot(path, journalPath=journalPath)
+    assert state(restored) == state(book)
+    assert state(replay(journalPath)) == state(book)
+
+    # Without a journal the snapshot has no offset to replay from
+    unjournaled = str(tmp_path / 'unjournaled.snapshot')
+    writeSnapshot(Orderbook(), unjournaled)
+    with pytest.raises(ValueError):
+        restoreSnapshot(unjournaled, journalPath=journalPath)
+
+def test_snapshotFallback(tmp_path):
+    # Orders that do not fit a fixed record are written as version 2
+    book = Orderbook()
+    book.processOrder(LimitOrder(0, Side.BUY, 5, 99, trader_id='t' * 50, v=27, r=b'short', s='0xabc'))
+    book.processOrder(LimitOrder(1, Side.SELL, 5, 101))
+    path = str(tmp_path / 'book.snapshot')
+    writeSnapshot(book, path)
+    with open(path, 'rb') as f:
+        assert SNAPSHOT_V1.unpack_from(f.read(), 0)[1] == 2
+    restored = restoreSnapshot(path)
+    assert state(restored) == state(book)
+
+def test_snapshotCorrupt(tmp_path):
+    book = Orderbook()
+    book.process_batch(create_orders(5, 100, markets=0))
+    path = str(tmp_path / 'book.snapshot')
+    writeSnapshot(book, path)
+    with open(path, 'r+b') as f:
+        assert SNAPSHOT_V1.unpack_from(f.read(), 0)[1] == VERSION
+        f.seek(-1, os.SEEK_END)
+        f.write(b'\xff')
+    with pytest.raises(ValueError):
+        restoreSnapshot(path)
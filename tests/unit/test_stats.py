@@ -0,0 +1,46 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Stats import Histogram, EngineStats
+from random import Random
+
+def test_histogram_precision():
+    rng = Random(22)
+    histogram = Histogram(precision=5)
+    values = sorted(rng.randint(0, 10**7) for _ in range(10000))
+    for value in values:
+        histogram.record(value)
+    for q in (0.5, 0.9, 0.99, 0.999):
+        exact = values[int(q * len(values) + 0.5) - 1]
+        assert abs(histogram.percentile(q) - exact) <= exact / 16 + 1
+    assert histogram.percentile(1.0) == values[-1]
+    assert len(histogram.counts) == histogram.maxIndex + 1 < 1024
+
+    # every value falls in a bucket whose range contains it
+    for value in list(range(200)) + values[::97]:
+        i = histogram.index(value)
+        assert (histogram.bucketValue(i - 1) if i else -1) < value <= histogram.bucketValue(i)
+
+def test_orderbook_stats():
+    OB = Orderbook()
+    assert OB.stats() == {'bidLevels': 0, 'askLevels': 0, 'restingOrders': 0, 'trades': 0}
+    stats = OB.enableStats()
+    for n in range(5):
+        OB.processOrder(LimitOrder(n, Side.SELL, 10, 100 + n))
+    OB.process_batch([MarketOrder(10, Side.BUY, 25), CancelOrder(4), CancelOrder(4)])
+
+    snapshot = OB.stats()
+    assert snapshot['messages'] == {'limit': 5, 'market': 1, 'cancel': 2}
+    assert snapshot['fills'] == 3 and snapshot['trades'] == 3
+    assert snapshot['levelsWalked']['max'] == 3
+    assert snapshot['cancelMisses'] == 1
+    assert snapshot['askLevels'] == 2 and snapshot['restingOrders'] == 2
+    assert snapshot['latencyNs']['limit']['p50'] > 0
+
+    OB.disableStats()
+    assert OB._match.__func__ is Orderbook._match and OB._cancel.__func__ is Orderbook._cancel
+    OB.processOrder(LimitOrder(20, Side.BUY, 1, 1))
+    assert stats.latency['limit'].count == 5
+    assert 'messages' not in OB.stats()
@@ -0,0 +1,55 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+
+def fill_book(book, numTrades):
+    for n in range(numTrades):
+        book.processOrder(LimitOrder(2*n, Side.SELL, 5, 100, trader_id='seller', v=27, r=b'sr', s=b'ss'))
+        book.processOrder(LimitOrder(2*n + 1, Side.BUY, 5, 100, trader_id='buyer', v=28, r=b'br', s=b'bs'))
+
+def test_lazyTrades():
+    book = Orderbook()
+    fill_book(book, 3)
+    assert len(book.trades) == 3
+
+    trade = book.trades[-1]
+    assert isinstance(trade, Trade)
+    assert trade.seq == 2
+    assert (trade.maker_order_id, trade.taker_order_id) == (4, 5)
+    assert (trade.price, trade.size) == (100, 5)
+    assert (trade.buyer_id, trade.seller_id) == ('buyer', 'seller')
+    assert (trade.v_maker, trade.r_maker, trade.s_maker) == (28, b'br', b'bs')
+    assert (trade.v_taker, trade.r_taker, trade.s_taker) == (27, b'sr', b'ss')
+    assert [t.seq for t in book.trades] == [0, 1, 2]
+
+def test_drain():
+    book = Orderbook(retainTrades=1)
+    fill_book(book, 5)
+    assert [t.seq for t in book.trades.drain(2)] == [0, 1]
+    assert book.trades.pending() == 3
+    # Only one drained trade is retained
+    assert len(book.trades) == 4
+    assert len(book.trades.prices) == 4
+
+    fill_book(book, 2)
+    assert [t.seq for t in book.trades.drain()] == [2, 3, 4, 5, 6]
+    assert book.trades.drain() == []
+    assert [t.seq for t in book.trades] == [6]
+
+def test_non_integer_values():
+    book = Orderbook()
+    book.processOrder(LimitOrder('a', Side.SELL, 5, 100.5))
+    book.processOrder(LimitOrder('b', Side.BUY, 2, 101))
+    assert book.asks.best.volume == 3
+    assert len(book.trades) == 1
+    trade = book.trades[0]
+    assert (trade.maker_order_id, trade.taker_order_id, trade.price, trade.size) == ('a', 'b', 100.5, 2)
+
+    book.processOrder(LimitOrder('c', Side.BUY, 3, 101))
+    book.processOrder(LimitOrder(2**70, Side.SELL, 1, 99))
+    book.processOrder(LimitOrder('d', Side.BUY, 1, 99))
+    assert [(t.maker_order_id, t.price) for t in book.trades] == [('a', 100.5), ('a', 100.5), (2**70, 99)]
+    assert len(book) == 0
+    assert len(book.trades.prices) == len(book.trades.seqs) == 3
@@ -0,0 +1,47 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from OrderMatchingEngine import *
+from OrderMatchingEngine.Wire import MESSAGE, encode, encodeMany, decode, decodeFile, convertJsonFile
+import json
+import pytest
+
+def fields(order):
+    return (order.__class__, order.order_id, order.side, order.remainingToFill, order.price,
+            order.trader_id, order.signature_type, order.v, order.r, order.s)
+
+def test_roundTrip():
+    orders = [
+        LimitOrder(1, Side.BUY, 10, 100, trader_id='0x' + 'ab' * 20, v=27, r=b'\x01' * 32, s=b'\x02' * 32),
+        MarketOrder(2, Side.SELL, 5),
+        CancelOrder(1),
+    ]
+    buffer = encodeMany(orders)
+    assert len(buffer) == 3 * MESSAGE.size
+    assert bytes(buffer[MESSAGE.size:2 * MESSAGE.size]) == encode(orders[1])
+
+    decoded = decode(memoryview(buffer))
+    assert [fields(o) for o in decoded] == [fields(o) for o in orders]
+
+def test_malformed():
+    good = encode(LimitOrder(1, Side.BUY, 10, 100))
+    for field, value in ((0, 7), (1, 2), (3, 5)):  # kind, side, signature type
+        values = list(MESSAGE.unpack(good))
+        values[field] = value
+        with pytest.raises(ValueError):
+            decode(MESSAGE.pack(*values))
+
+def test_convertJsonFile(tmp_path):
+    records = [{'orderId': n, 'side': n % 2, 'size': 10, 'price': 100 + n,
+                'trader': '0x90F79bf6EB2c4f870365E785982E1f101E93b906', 'signatureType': 'EIP-712',
+                'v': 28, 'r': '0x' + '0b' * 32, 's': '0x' + '1f' * 32} for n in range(20)]
+    source = tmp_path / 'orders.json'
+    source.write_text(json.dumps(records))
+    destination = str(tmp_path / 'orders.bin')
+
+    assert convertJsonFile(str(source), destination, chunk_size=8) == 20
+    orders = decodeFile(destination)
+    assert [o.price for o in orders] == [100 + n for n in range(20)]
+    assert orders[3].trader_id == '0x90f79bf6eb2c4f870365e785982e1f101e93b906'
+    assert orders[3].r == bytes.fromhex('0b' * 32)